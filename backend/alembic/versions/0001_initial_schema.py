@@ -0,0 +1,82 @@
+"""Initial schema
+
+Creates the tables as they were before upsert ingestion. Databases created
+earlier with init_db() already have them and are left untouched.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "tenants" not in existing:
+        op.create_table(
+            "tenants",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("subdomain", sa.String(), nullable=False),
+            sa.Column("industry", sa.String(), nullable=True),
+            sa.Column("features", sa.JSON(), nullable=False),
+            sa.Column("primary_color", sa.String(), nullable=False),
+            sa.Column("secondary_color", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_tenants_id", "tenants", ["id"])
+        op.create_index("ix_tenants_subdomain", "tenants", ["subdomain"], unique=True)
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("is_admin", sa.Boolean(), nullable=False),
+            sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "marketing_data" not in existing:
+        op.create_table(
+            "marketing_data",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=False),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("channel", sa.String(), nullable=False),
+            sa.Column("spend", sa.Float(), nullable=False),
+            sa.Column("impressions", sa.Float(), nullable=True),
+            sa.Column("clicks", sa.Float(), nullable=True),
+            sa.Column("conversions", sa.Float(), nullable=True),
+            sa.Column("revenue", sa.Float(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_marketing_data_id", "marketing_data", ["id"])
+        op.create_index("ix_marketing_data_tenant_id", "marketing_data", ["tenant_id"])
+        op.create_index("ix_marketing_data_date", "marketing_data", ["date"])
+        op.create_index("ix_marketing_data_channel", "marketing_data", ["channel"])
+
+
+def downgrade() -> None:
+    op.drop_table("marketing_data")
+    op.drop_table("users")
+    op.drop_table("tenants")
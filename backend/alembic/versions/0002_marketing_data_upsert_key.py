@@ -0,0 +1,91 @@
+"""Add the upsert key and content hash to marketing_data
+
+Upsert ingestion needs a unique (tenant_id, date, channel) key for
+ON CONFLICT and a content_hash to skip unchanged rows.
+
+Existing duplicates of the key are removed first, keeping the most recently
+written row (the same "last row wins" rule upsert ingestion applies), so
+aggregates are no longer inflated. Existing rows then get their content
+hash backfilled, so the first re-upload after migrating only writes rows
+that actually changed. Both steps are skipped where the column or
+constraint already exists (databases created with init_db()).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+CONSTRAINT_NAME = "uq_marketing_data_tenant_date_channel"
+BACKFILL_BATCH_SIZE = 10_000
+
+# Frozen copies of ingestion_service.VALUE_COLUMNS and compute_content_hash
+# as of this revision; the backfill must not change if those do
+VALUE_COLUMNS = ("spend", "impressions", "clicks", "conversions", "revenue")
+
+
+def compute_content_hash(row) -> str:
+    parts = [row.date.isoformat(), row.channel]
+    parts.extend(repr(getattr(row, name)) for name in VALUE_COLUMNS)
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "content_hash" not in {c["name"] for c in inspector.get_columns("marketing_data")}:
+        op.add_column("marketing_data", sa.Column("content_hash", sa.String(32), nullable=True))
+
+    if CONSTRAINT_NAME not in {c["name"] for c in inspector.get_unique_constraints("marketing_data")}:
+        op.execute("""
+            DELETE FROM marketing_data m
+            USING (
+                SELECT id, row_number() OVER (
+                    PARTITION BY tenant_id, date, channel
+                    ORDER BY COALESCE(updated_at, created_at) DESC NULLS LAST, id DESC
+                ) AS position
+                FROM marketing_data
+            ) ranked
+            WHERE m.id = ranked.id AND ranked.position > 1
+        """)
+        op.create_unique_constraint(CONSTRAINT_NAME, "marketing_data", ["tenant_id", "date", "channel"])
+
+    _backfill_content_hashes(bind)
+
+
+def _backfill_content_hashes(bind) -> None:
+    """
+    Hash rows written before content_hash existed, in id-ordered batches
+    """
+    select = sa.text(f"""
+        SELECT id, date, channel, {", ".join(VALUE_COLUMNS)}
+        FROM marketing_data
+        WHERE content_hash IS NULL AND id > :after
+        ORDER BY id
+        LIMIT :limit
+    """)
+    update = sa.text("UPDATE marketing_data SET content_hash = :content_hash WHERE id = :id")
+    after = ""
+    while True:
+        rows = bind.execute(select, {"after": after, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(update, [{"id": row.id, "content_hash": compute_content_hash(row)} for row in rows])
+        after = rows[-1].id
+
+
+def downgrade() -> None:
+    # Rows removed as duplicates during upgrade are not restored
+    op.drop_constraint(CONSTRAINT_NAME, "marketing_data", type_="unique")
+    op.drop_column("marketing_data", "content_hash")
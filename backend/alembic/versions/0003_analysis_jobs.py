@@ -0,0 +1,38 @@
+"""Add analysis_jobs
+
+Analysis jobs were kept in the memory of the API worker that ran them, so
+other workers could not report them and restarts lost them.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("analysis_jobs"):
+        return
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_analysis_jobs_id", "analysis_jobs", ["id"])
+    op.create_index("ix_analysis_jobs_tenant_id", "analysis_jobs", ["tenant_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_jobs")
@@ -1,5 +1,5 @@
 import os
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional, Dict, Any
 
 class Settings(BaseSettings):
@@ -28,10 +28,44 @@ class Settings(BaseSettings):
     
     # Tenant Settings
     DEFAULT_TENANT_FEATURES: List[str] = ["dashboard", "data_upload", "basic_analysis"]
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+
+    # Analysis Memory Governance
+    # Each analysis job runs in its own worker process with its heap capped at
+    # ANALYSIS_MEMORY_LIMIT_MB. Candidate design matrices are built in chunks of
+    # at most ANALYSIS_MATRIX_BUDGET_MB; blocks that cannot fit are memory-mapped
+    # into ANALYSIS_SPILL_DIR (system temp dir if unset). A fresh worker uses
+    # about ANALYSIS_WORKER_BASELINE_MB for the interpreter, numpy and app
+    # imports before fitting, which is reserved out of the limit.
+    ANALYSIS_ISOLATE_JOBS: bool = True
+    ANALYSIS_MEMORY_LIMIT_MB: int = 2048
+    ANALYSIS_WORKER_BASELINE_MB: int = 96
+    ANALYSIS_MATRIX_BUDGET_MB: int = 256
+    ANALYSIS_SPILL_DIR: Optional[str] = os.getenv("ANALYSIS_SPILL_DIR")
+
+    # Tenant Quotas
+    # Rate limits are [tokens_per_second, burst] per route class; concurrency
+    # caps the number of in-flight ingestion requests and running analysis
+    # jobs per tenant. The in-memory backend tracks buckets for at most
+    # QUOTA_MAX_TRACKED_TENANTS tenants, evicting the least recently seen.
+    QUOTA_ENABLED: bool = True
+    QUOTA_REDIS_URL: Optional[str] = os.getenv("QUOTA_REDIS_URL")
+    QUOTA_MAX_TRACKED_TENANTS: int = 10000
+    QUOTA_TIERS: Dict[str, Dict[str, Dict[str, Any]]] = {
+        "basic": {
+            "rate": {"read": [5.0, 30], "ingestion": [0.05, 3], "analysis": [0.02, 2]},
+            "concurrency": {"ingestion": 1, "analysis": 1},
+        },
+        "professional": {
+            "rate": {"read": [20.0, 100], "ingestion": [0.2, 10], "analysis": [0.1, 5]},
+            "concurrency": {"ingestion": 2, "analysis": 2},
+        },
+        "enterprise": {
+            "rate": {"read": [50.0, 250], "ingestion": [1.0, 30], "analysis": [0.5, 10]},
+            "concurrency": {"ingestion": 4, "analysis": 4},
+        },
+    }
+
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
 settings = Settings() 
\ No newline at end of file
@@ -0,0 +1,315 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Route classes with independent buckets
+ROUTE_CLASS_READ = "read"
+ROUTE_CLASS_INGESTION = "ingestion"
+ROUTE_CLASS_ANALYSIS = "analysis"
+
+# Path prefixes for the expensive route classes; everything else is "read"
+_ROUTE_PREFIXES = (
+    ("/tenant/data/upload", ROUTE_CLASS_INGESTION),
+    ("/tenant/analysis/run", ROUTE_CLASS_ANALYSIS),
+)
+
+# Route classes whose concurrency slot is held by the background job the
+# request starts, not by the request itself
+JOB_ROUTE_CLASSES = frozenset({ROUTE_CLASS_ANALYSIS})
+
+
+class QuotaExceeded(Exception):
+    """Exception raised when a tenant exceeds its rate or concurrency quota"""
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def classify_route(path: str) -> str:
+    """
+    Map a request path to its quota route class
+    """
+    for prefix, route_class in _ROUTE_PREFIXES:
+        if path.startswith(prefix):
+            return route_class
+    return ROUTE_CLASS_READ
+
+
+def get_tier_for_features(features: Iterable[str]) -> str:
+    """
+    Derive the quota tier from a tenant's feature list
+
+    Uses the same enterprise threshold as the admin statistics endpoint.
+    """
+    features = list(features)
+    if len(features) >= 5:
+        return "enterprise"
+    if "advanced_analysis" in features:
+        return "professional"
+    return "basic"
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens per second
+
+    State is kept in slots and updated in place, so a check does no
+    allocation beyond the float arithmetic.
+    """
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def consume(self, now: float) -> float:
+        """
+        Take one token; return 0.0 on success, otherwise seconds until one is available
+        """
+        tokens = self.tokens + (now - self.updated) * self.rate
+        if tokens > self.capacity:
+            tokens = self.capacity
+        self.updated = now
+        if tokens >= 1.0:
+            self.tokens = tokens - 1.0
+            return 0.0
+        self.tokens = tokens
+        return (1.0 - tokens) / self.rate
+
+
+class TierLimits:
+    """Resolved limits for one tier, looked up once per request"""
+    __slots__ = ("name", "rate", "concurrency")
+
+    def __init__(self, name: str, config: Dict[str, Dict]):
+        self.name = name
+        # route class -> (tokens per second, burst)
+        self.rate = {k: (float(v[0]), float(v[1])) for k, v in config.get("rate", {}).items()}
+        # route class -> max in-flight requests
+        self.concurrency = {k: int(v) for k, v in config.get("concurrency", {}).items()}
+
+
+class InMemoryQuotaBackend:
+    """
+    Per-process quota state
+
+    Buckets and in-flight counters are nested dicts keyed by tenant then
+    route class, so the hot path is two dict lookups on existing strings.
+    Limits are only consistent within one worker process.
+
+    Buckets are kept for at most max_tenants tenants. The least recently
+    seen tenant is evicted first; its bucket has had the longest to refill,
+    so eviction rarely loses state. In-flight counters are dropped once they
+    return to zero.
+    """
+    def __init__(self, max_tenants: Optional[int] = None):
+        self.max_tenants = max_tenants if max_tenants is not None else settings.QUOTA_MAX_TRACKED_TENANTS
+        self._buckets: "OrderedDict[str, Dict[str, TokenBucket]]" = OrderedDict()
+        self._inflight: Dict[str, Dict[str, int]] = {}
+
+    async def consume(self, tenant_id: str, route_class: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        tenant_buckets = self._buckets.get(tenant_id)
+        if tenant_buckets is None:
+            tenant_buckets = self._buckets[tenant_id] = {}
+            if len(self._buckets) > self.max_tenants:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(tenant_id)
+        bucket = tenant_buckets.get(route_class)
+        if bucket is None:
+            bucket = tenant_buckets[route_class] = TokenBucket(rate, burst, now)
+        elif bucket.rate != rate or bucket.capacity != burst:
+            # Tenant changed tier; keep the current fill level
+            bucket.rate = rate
+            bucket.capacity = burst
+        return bucket.consume(now)
+
+    async def acquire_slot(self, tenant_id: str, route_class: str, limit: int) -> bool:
+        counters = self._inflight.get(tenant_id)
+        if counters is None:
+            counters = self._inflight[tenant_id] = {}
+        current = counters.get(route_class, 0)
+        if current >= limit:
+            return False
+        counters[route_class] = current + 1
+        return True
+
+    async def release_slot(self, tenant_id: str, route_class: str) -> None:
+        counters = self._inflight.get(tenant_id)
+        if not counters or counters.get(route_class, 0) <= 0:
+            return
+        if counters[route_class] > 1:
+            counters[route_class] -= 1
+            return
+        del counters[route_class]
+        if not counters:
+            del self._inflight[tenant_id]
+
+
+# KEYS[1] bucket hash; ARGV rate, burst. Uses server time so all workers agree.
+_REDIS_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+# KEYS[1] counter; ARGV limit, ttl. The TTL bounds leaked slots if a worker dies.
+_REDIS_ACQUIRE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+
+class RedisQuotaBackend:
+    """
+    Quota state shared across worker processes through Redis
+
+    Bucket refill and slot acquisition run as Lua scripts so each check is a
+    single atomic round trip. Redis errors fail open so an unavailable quota
+    store never takes the API down with it.
+    """
+    SLOT_TTL_SECONDS = 3600
+
+    def __init__(self, url: str, key_prefix: str = "quota"):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as exc:
+            raise RuntimeError("QUOTA_REDIS_URL is set but the redis package is not installed") from exc
+
+        self._errors = aioredis.RedisError
+        self._client = aioredis.from_url(url)
+        self._prefix = key_prefix
+        self._bucket_script = self._client.register_script(_REDIS_BUCKET_SCRIPT)
+        self._acquire_script = self._client.register_script(_REDIS_ACQUIRE_SCRIPT)
+
+    async def consume(self, tenant_id: str, route_class: str, rate: float, burst: float) -> float:
+        key = f"{self._prefix}:bucket:{tenant_id}:{route_class}"
+        try:
+            return float(await self._bucket_script(keys=[key], args=[rate, burst]))
+        except self._errors:
+            logger.warning("Quota backend unavailable, allowing request", exc_info=True)
+            return 0.0
+
+    async def acquire_slot(self, tenant_id: str, route_class: str, limit: int) -> bool:
+        key = f"{self._prefix}:inflight:{tenant_id}:{route_class}"
+        try:
+            return bool(await self._acquire_script(keys=[key], args=[limit, self.SLOT_TTL_SECONDS]))
+        except self._errors:
+            logger.warning("Quota backend unavailable, allowing request", exc_info=True)
+            return True
+
+    async def release_slot(self, tenant_id: str, route_class: str) -> None:
+        key = f"{self._prefix}:inflight:{tenant_id}:{route_class}"
+        try:
+            if await self._client.decr(key) < 0:
+                await self._client.set(key, 0)
+        except self._errors:
+            logger.warning("Quota backend unavailable, slot not released", exc_info=True)
+
+
+class QuotaManager:
+    """
+    Tenant-aware rate and concurrency limits
+
+    Tenant tiers are resolved from feature lists when tenants are registered,
+    so request-time checks only look up precomputed limits.
+    """
+    def __init__(self, backend, tiers: Optional[Dict[str, Dict]] = None,
+                 default_features: Optional[List[str]] = None):
+        self.backend = backend
+        tiers = tiers if tiers is not None else settings.QUOTA_TIERS
+        self._tiers = {name: TierLimits(name, config) for name, config in tiers.items()}
+        features = default_features if default_features is not None else settings.DEFAULT_TENANT_FEATURES
+        self._default_limits = self._tiers[get_tier_for_features(features)]
+        self._tenant_limits: Dict[str, TierLimits] = {}
+
+    def set_tenant_features(self, tenant_id: str, features: Iterable[str]) -> None:
+        """
+        Register or update a tenant's features (and therefore its tier)
+        """
+        self._tenant_limits[tenant_id] = self._tiers[get_tier_for_features(features)]
+
+    def register_tenants(self, tenants: Iterable[Dict]) -> None:
+        """
+        Register tiers for tenant records with "id" and "features" keys
+        """
+        for tenant in tenants:
+            self.set_tenant_features(tenant["id"], tenant["features"])
+
+    def limits_for(self, tenant_id: str) -> TierLimits:
+        return self._tenant_limits.get(tenant_id, self._default_limits)
+
+    async def check_rate(self, tenant_id: str, route_class: str) -> None:
+        """
+        Consume one token for the route class or raise QuotaExceeded
+        """
+        limits = self.limits_for(tenant_id)
+        rate = limits.rate.get(route_class)
+        if rate is None:
+            return
+        wait = await self.backend.consume(tenant_id, route_class, rate[0], rate[1])
+        if wait > 0.0:
+            raise QuotaExceeded(f"Rate limit exceeded for {route_class} requests", wait)
+
+    async def acquire_slot(self, tenant_id: str, route_class: str) -> bool:
+        """
+        Reserve a concurrency slot; returns False if the route class is not limited
+
+        Raises QuotaExceeded when the tenant already has the maximum number of
+        in-flight requests (or running jobs) for the route class.
+        """
+        limit = self.limits_for(tenant_id).concurrency.get(route_class)
+        if limit is None:
+            return False
+        if not await self.backend.acquire_slot(tenant_id, route_class, limit):
+            raise QuotaExceeded(f"Too many concurrent {route_class} requests", 1.0)
+        return True
+
+    async def release_slot(self, tenant_id: str, route_class: str) -> None:
+        await self.backend.release_slot(tenant_id, route_class)
+
+
+def create_quota_backend():
+    """
+    Create the shared Redis backend if configured, otherwise in-memory
+    """
+    if settings.QUOTA_REDIS_URL:
+        return RedisQuotaBackend(settings.QUOTA_REDIS_URL)
+    return InMemoryQuotaBackend()
+
+
+quota_manager = QuotaManager(create_quota_backend())
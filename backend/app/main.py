@@ -1,13 +1,32 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.config import settings
+from app.core.quota import JOB_ROUTE_CLASSES, QuotaExceeded, classify_route, quota_manager
+from app.core.tenant import get_tenant_id_from_subdomain
+from app.routers.admin import MOCK_TENANTS
+from app.utils.serialization import ORJSONResponse
+
 # Import routers (will be implemented later)
 # from app.routers import admin, tenant, auth
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resolve quota tiers for known tenants before serving requests
+    # (will load tenants from the database)
+    quota_manager.register_tenants(MOCK_TENANTS)
+    yield
+
 app = FastAPI(
     title="Marketing Mix Modeling SaaS Platform",
     description="API for multi-tenant marketing mix modeling platform",
-    version="0.1.0"
+    version="0.1.0",
+    # orjson is considerably faster than the stdlib encoder for the large
+    # dashboard / attribution / export payloads
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -19,6 +38,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tenant quota middleware
+# Registered before the tenant middleware so it runs inside it (the last
+# registered middleware is outermost) and request.state.tenant_id is set.
+# Requests without a tenant (admin, api and bare hosts) are not limited.
+# Analysis slots are held by the job itself, see routers/tenant.py.
+@app.middleware("http")
+async def enforce_tenant_quota(request: Request, call_next):
+    tenant_id = getattr(request.state, "tenant_id", None)
+    if not settings.QUOTA_ENABLED or not tenant_id:
+        return await call_next(request)
+
+    route_class = classify_route(request.url.path)
+    try:
+        await quota_manager.check_rate(tenant_id, route_class)
+        holds_slot = (
+            route_class not in JOB_ROUTE_CLASSES
+            and await quota_manager.acquire_slot(tenant_id, route_class)
+        )
+    except QuotaExceeded as exc:
+        return ORJSONResponse(
+            status_code=429,
+            content={"detail": exc.detail},
+            headers={"Retry-After": exc.retry_after_header},
+        )
+
+    if not holds_slot:
+        return await call_next(request)
+    try:
+        return await call_next(request)
+    finally:
+        await quota_manager.release_slot(tenant_id, route_class)
+
 # Tenant middleware
 @app.middleware("http")
 async def add_tenant_context(request: Request, call_next):
@@ -27,7 +78,7 @@ async def add_tenant_context(request: Request, call_next):
     subdomain = host.split(".")[0] if "." in host else None
     
     # Add tenant info to request state (actual implementation will lookup tenant in DB)
-    request.state.tenant_id = subdomain
+    request.state.tenant_id = get_tenant_id_from_subdomain(subdomain)
     
     response = await call_next(request)
     return response
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, ForeignKey, DateTime, JSON
+from sqlalchemy.sql import func
+
+from app.utils.db import Base
+
+class AnalysisJob(Base):
+    """
+    SQLAlchemy model for marketing mix model analysis jobs
+
+    Jobs live in the database so any API worker can report a job started by
+    another, and results survive restarts.
+    """
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False, index=True)
+    status = Column(String, nullable=False)
+    # The full AnalysisResult as JSON
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Make sure RLS is enabled on this table
+    __table_args__ = {'info': {'rls': True}}
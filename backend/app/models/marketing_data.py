@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Date, ForeignKey, DateTime
+from sqlalchemy import Column, String, Float, Date, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 import uuid
 
@@ -19,10 +19,13 @@ class MarketingData(Base):
     clicks = Column(Float, nullable=True)
     conversions = Column(Float, nullable=True)
     revenue = Column(Float, nullable=True)
+    # Hash of the row's measured values, used by upsert ingestion to skip unchanged rows
+    content_hash = Column(String(32), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Make sure RLS is enabled on this table
-    __table_args__ = {
-        'info': {'rls': True}
-    } 
\ No newline at end of file
+    # Natural key for upsert ingestion; make sure RLS is enabled on this table
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'date', 'channel', name='uq_marketing_data_tenant_date_channel'),
+        {'info': {'rls': True}},
+    ) 
\ No newline at end of file
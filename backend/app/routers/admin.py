@@ -1,6 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Dict, Any
 
+from app.core.quota import quota_manager
+from app.schemas.tenant import TenantSummary, TenantSummaryListAdapter
+from app.utils.serialization import typed_json_response
+
 # These will be implemented later
 # from app.schemas.tenant import TenantCreate, TenantUpdate, TenantDetail
 # from app.services.tenant_service import TenantService
@@ -32,14 +36,15 @@ MOCK_TENANTS = [
     }
 ]
 
-@router.get("/tenants", response_model=List[Dict[str, Any]])
+@router.get("/tenants", response_model=List[TenantSummary])
 def get_tenants():
     """
     Get all tenants (admin only)
     """
-    return MOCK_TENANTS
+    tenants = TenantSummaryListAdapter.validate_python(MOCK_TENANTS)
+    return typed_json_response(TenantSummaryListAdapter, tenants)
 
-@router.post("/tenants", status_code=status.HTTP_201_CREATED)
+@router.post("/tenants", response_model=TenantSummary, status_code=status.HTTP_201_CREATED)
 def create_tenant(tenant_data: Dict[str, Any]):
     """
     Create a new tenant (admin only)
@@ -58,10 +63,11 @@ def create_tenant(tenant_data: Dict[str, Any]):
     
     # Add to mock database
     MOCK_TENANTS.append(new_tenant)
+    quota_manager.set_tenant_features(new_tenant["id"], new_tenant["features"])
     
     return new_tenant
 
-@router.get("/tenants/{tenant_id}", response_model=Dict[str, Any])
+@router.get("/tenants/{tenant_id}", response_model=TenantSummary)
 def get_tenant(tenant_id: str):
     """
     Get tenant by ID (admin only)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import Dict, Any
 from datetime import timedelta
 
+from app.schemas.user import Token, CurrentUser
+
 # These will be implemented later
 # from app.core.security import create_access_token, verify_password
 # from app.core.config import settings
@@ -37,7 +38,7 @@ MOCK_USERS = {
     }
 }
 
-@router.post("/login", response_model=Dict[str, Any])
+@router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     OAuth2 compatible token login, get an access token for future requests
@@ -73,7 +74,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         "token_type": "bearer"
     }
 
-@router.get("/me", response_model=Dict[str, Any])
+@router.get("/me", response_model=CurrentUser)
 async def read_users_me(token: str = Depends(oauth2_scheme)):
     """
     Get current user
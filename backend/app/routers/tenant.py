@@ -1,12 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from datetime import datetime, timezone
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, Any, List, Optional
+import csv
+import io
+import logging
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.quota import QuotaExceeded, ROUTE_CLASS_ANALYSIS, quota_manager
+from app.core.tenant import set_tenant_context_in_db
+from app.models.marketing_data import MarketingData
+from app.schemas.marketing_data import (
+    DashboardMetrics, AnalysisResult, IngestionReport, MarketingDataInDB,
+    MarketingDataCreateListAdapter, MarketingDataInDBListAdapter
+)
+from app.services.ingestion_service import IngestionService, IngestionMode
+from app.services.mmm_service import MMMService, new_analysis_id
+from app.utils.db import SessionLocal, get_db
+from app.utils.serialization import typed_json_response
 
 # These will be implemented later
 # from app.core.tenant import get_tenant_or_404
-# from app.services.mmm_service import MMMService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# PostgreSQL SQLSTATE codes for integrity errors raised during ingestion
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
 # Mock data
 MOCK_MARKETING_DATA = {
     "acme": [
@@ -20,7 +46,7 @@ MOCK_MARKETING_DATA = {
     ]
 }
 
-@router.get("/dashboard/metrics")
+@router.get("/dashboard/metrics", response_model=DashboardMetrics)
 async def get_dashboard_metrics(tenant_id: str = "acme"):  # Will use Depends(get_tenant_or_404)
     """
     Get dashboard metrics for the current tenant
@@ -63,63 +89,180 @@ async def get_dashboard_metrics(tenant_id: str = "acme"):  # Will use Depends(ge
         "performance": performance
     }
 
-@router.post("/data/upload")
-async def upload_marketing_data(
+@router.post("/data/upload", response_model=IngestionReport)
+def upload_marketing_data(
     file: UploadFile = File(...),
-    tenant_id: str = "acme"  # Will use Depends(get_tenant_or_404)
+    mode: IngestionMode = IngestionMode.UPSERT,
+    tenant_id: str = "acme",  # Will use Depends(get_tenant_or_404)
+    db: Session = Depends(get_db)
 ):
     """
-    Upload marketing data for the current tenant
+    Upload marketing data (CSV) for the current tenant
+
+    In upsert mode, re-uploaded rows are matched on (date, channel) and only
+    new or changed rows are written.
     """
-    # Pretend to process the file
-    return {
+    # Empty cells are missing values, not empty strings
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig"))
+    try:
+        records = [{k: (v if v != "" else None) for k, v in record.items()} for record in reader]
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid marketing data file: expected a UTF-8 encoded CSV"
+        )
+    try:
+        rows = MarketingDataCreateListAdapter.validate_python(records)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid marketing data file: {exc.error_count()} invalid values"
+        )
+
+    set_tenant_context_in_db(tenant_id, db)
+    try:
+        report = IngestionService(db).ingest(tenant_id, rows, mode)
+    except IntegrityError as exc:
+        db.rollback()
+        pgcode = getattr(exc.orig, "pgcode", None)
+        if pgcode == UNIQUE_VIOLATION and mode == IngestionMode.APPEND:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Data already exists for some dates and channels; upload in upsert mode"
+            )
+        if pgcode == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tenant not found"
+            )
+        raise
+
+    return report.model_copy(update={
         "filename": file.filename,
-        "status": "processed",
-        "rows_processed": 150,
         "message": "Data successfully uploaded and processed"
-    }
+    })
+
+@router.get("/data/export", response_model=List[MarketingDataInDB])
+def export_marketing_data(
+    tenant_id: str = "acme",  # Will use Depends(get_tenant_or_404)
+    db: Session = Depends(get_db)
+):
+    """
+    Export all marketing data for the current tenant
+
+    Serialized straight to JSON bytes by the precompiled list adapter.
+    """
+    set_tenant_context_in_db(tenant_id, db)
+    rows = (
+        db.query(MarketingData)
+        .filter(MarketingData.tenant_id == tenant_id)
+        .order_by(MarketingData.date, MarketingData.channel)
+        .all()
+    )
+    data = MarketingDataInDBListAdapter.validate_python(rows, from_attributes=True)
+    return typed_json_response(MarketingDataInDBListAdapter, data)
 
-@router.post("/analysis/run")
+def _run_analysis(analysis_id: str, tenant_id: str) -> None:
+    with SessionLocal() as db:
+        set_tenant_context_in_db(tenant_id, db)
+        service = MMMService(db)
+        try:
+            result = service.run_job(tenant_id, analysis_id=analysis_id)
+        except Exception:
+            logger.exception("Analysis %s failed", analysis_id)
+            db.rollback()
+            result = AnalysisResult(
+                analysis_id=analysis_id,
+                status="failed",
+                created_at=datetime.now(timezone.utc),
+                message="Analysis failed unexpectedly"
+            )
+        service.save_job(tenant_id, result)
+
+async def run_analysis_job(analysis_id: str, tenant_id: str, slot_tenant_id: Optional[str]) -> None:
+    """
+    Run an analysis job, store its result and release its concurrency slot
+
+    slot_tenant_id is the quota tenant holding the slot, or None if no slot
+    was taken. The fit runs in the threadpool so it never blocks the event loop.
+    """
+    try:
+        await run_in_threadpool(_run_analysis, analysis_id, tenant_id)
+    except Exception:
+        logger.exception("Could not store the result of analysis %s", analysis_id)
+    finally:
+        if slot_tenant_id is not None:
+            await quota_manager.release_slot(slot_tenant_id, ROUTE_CLASS_ANALYSIS)
+
+@router.post("/analysis/run", response_model=AnalysisResult, status_code=status.HTTP_202_ACCEPTED)
 async def run_marketing_mix_model(
-    analysis_params: Dict[str, Any],
-    tenant_id: str = "acme"  # Will use Depends(get_tenant_or_404)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    analysis_params: Optional[Dict[str, Any]] = None,
+    tenant_id: str = "acme",  # Will use Depends(get_tenant_or_404)
+    db: Session = Depends(get_db)
 ):
     """
-    Run a marketing mix model for the current tenant
+    Start a marketing mix model run for the current tenant
+
+    Returns immediately with status "processing"; poll
+    /analysis/{analysis_id} for the result. Jobs are stored in the database,
+    so any API worker can report them. The tenant's analysis concurrency
+    slot is held until the job finishes. Slots are keyed on the tenant
+    resolved from the subdomain, as the quota middleware's buckets are.
     """
-    return {
-        "analysis_id": "mmm_2023_03_13_001",
-        "status": "processing",
-        "estimated_completion_time": "2 minutes",
-        "message": "Analysis job started successfully"
-    }
+    quota_tenant_id = getattr(request.state, "tenant_id", None)
+    slot_tenant_id = None
+    if settings.QUOTA_ENABLED and quota_tenant_id:
+        try:
+            if await quota_manager.acquire_slot(quota_tenant_id, ROUTE_CLASS_ANALYSIS):
+                slot_tenant_id = quota_tenant_id
+        except QuotaExceeded as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=exc.detail,
+                headers={"Retry-After": exc.retry_after_header}
+            )
 
-@router.get("/analysis/{analysis_id}")
-async def get_analysis_results(
+    job = AnalysisResult(
+        analysis_id=new_analysis_id(),
+        status="processing",
+        created_at=datetime.now(timezone.utc),
+        message="Analysis job started successfully"
+    )
+    set_tenant_context_in_db(tenant_id, db)
+    try:
+        await run_in_threadpool(MMMService(db).save_job, tenant_id, job)
+    except Exception as exc:
+        if slot_tenant_id is not None:
+            await quota_manager.release_slot(slot_tenant_id, ROUTE_CLASS_ANALYSIS)
+        db.rollback()
+        if isinstance(exc, IntegrityError) and getattr(exc.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tenant not found"
+            )
+        raise
+    background_tasks.add_task(run_analysis_job, job.analysis_id, tenant_id, slot_tenant_id)
+    return job
+
+@router.get("/analysis/{analysis_id}", response_model=AnalysisResult)
+def get_analysis_results(
     analysis_id: str,
-    tenant_id: str = "acme"  # Will use Depends(get_tenant_or_404)
+    tenant_id: str = "acme",  # Will use Depends(get_tenant_or_404)
+    db: Session = Depends(get_db)
 ):
     """
     Get results of a marketing mix model analysis
     """
-    # Mock MMM results
-    return {
-        "analysis_id": analysis_id,
-        "status": "completed",
-        "results": {
-            "channel_attribution": [
-                {"channel": "Facebook", "contribution": 25.3, "roi": 2.8},
-                {"channel": "Google", "contribution": 42.1, "roi": 4.2},
-                {"channel": "TV", "contribution": 18.7, "roi": 1.5},
-                {"channel": "Base", "contribution": 13.9, "roi": None}
-            ],
-            "model_accuracy": {
-                "r_squared": 0.87,
-                "mape": 8.2
-            }
-        },
-        "created_at": "2023-03-13T10:30:00Z"
-    }
+    set_tenant_context_in_db(tenant_id, db)
+    job = MMMService(db).get_job(tenant_id, analysis_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found"
+        )
+    return job
 
 @router.get("/recommendations")
 async def get_optimization_recommendations(
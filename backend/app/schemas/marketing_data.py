@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing import List, Optional
 from datetime import date, datetime
 
 class MarketingDataBase(BaseModel):
@@ -22,14 +22,25 @@ class MarketingDataInDB(MarketingDataBase):
     tenant_id: str
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
-    class Config:
-        orm_mode = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 class MarketingDataBulkUpload(BaseModel):
     """Schema for bulk uploading marketing data"""
     data: List[MarketingDataBase]
 
+class IngestionReport(BaseModel):
+    """Schema for the result of a marketing data ingestion"""
+    filename: Optional[str] = None
+    status: str = "processed"
+    mode: str
+    rows_processed: int
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates_in_batch: int = 0
+    message: Optional[str] = None
+
 class ChannelMetrics(BaseModel):
     """Schema for channel metrics"""
     channel: str
@@ -59,6 +70,8 @@ class ChannelAttribution(BaseModel):
     channel: str
     contribution: float
     roi: Optional[float] = None
+    adstock_decay: Optional[float] = None
+    half_saturation: Optional[float] = None
 
 class ModelAccuracy(BaseModel):
     """Schema for model accuracy metrics"""
@@ -67,6 +80,9 @@ class ModelAccuracy(BaseModel):
 
 class MMMResults(BaseModel):
     """Schema for marketing mix modeling results"""
+    # "model_accuracy" would otherwise clash with pydantic's model_ namespace
+    model_config = ConfigDict(protected_namespaces=())
+
     channel_attribution: List[ChannelAttribution]
     model_accuracy: ModelAccuracy
 
@@ -75,4 +91,13 @@ class AnalysisResult(BaseModel):
     analysis_id: str
     status: str
     results: Optional[MMMResults] = None
-    created_at: datetime 
\ No newline at end of file
+    created_at: datetime
+    estimated_memory_mb: Optional[float] = None
+    peak_memory_mb: Optional[float] = None
+    message: Optional[str] = None 
+
+# Precompiled adapters for list payloads. Building a TypeAdapter compiles the
+# pydantic-core validator/serializer once, so exports of large row sets can go
+# straight to JSON bytes without per-request schema construction.
+MarketingDataCreateListAdapter = TypeAdapter(List[MarketingDataCreate])
+MarketingDataInDBListAdapter = TypeAdapter(List[MarketingDataInDB])
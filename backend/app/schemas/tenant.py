@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -13,8 +13,9 @@ class TenantBase(BaseModel):
 
 class TenantCreate(TenantBase):
     """Schema for tenant creation"""
-    @validator('subdomain')
-    def validate_subdomain(cls, v):
+    @field_validator('subdomain')
+    @classmethod
+    def validate_subdomain(cls, v: str) -> str:
         if not v.isalnum():
             raise ValueError('Subdomain must be alphanumeric')
         return v.lower()
@@ -34,10 +35,25 @@ class TenantInDB(TenantBase):
     is_active: bool = True
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
-    class Config:
-        orm_mode = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 class TenantDetail(TenantInDB):
     """Schema for detailed tenant information"""
-    pass 
\ No newline at end of file
+    pass 
+
+class TenantSummary(BaseModel):
+    """Schema for tenants in admin listings (camelCase colors, as the admin UI expects)"""
+    id: str
+    name: str
+    subdomain: str
+    industry: Optional[str] = None
+    features: List[str] = Field(default_factory=list)
+    primary_color: str = Field("#3B82F6", alias="primaryColor")
+    secondary_color: str = Field("#1E40AF", alias="secondaryColor")
+    is_active: bool = True
+
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+# Precompiled adapter for tenant list payloads (admin listings)
+TenantSummaryListAdapter = TypeAdapter(List[TenantSummary])
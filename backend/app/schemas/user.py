@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class Token(BaseModel):
+    """Schema for an issued access token"""
+    access_token: str
+    token_type: str = "bearer"
+
+class CurrentUser(BaseModel):
+    """Schema for the authenticated user"""
+    username: str
+    email: str
+    is_admin: bool
+    tenant_id: Optional[str] = None
@@ -0,0 +1,148 @@
+import hashlib
+import uuid
+from enum import Enum
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import Column, Date, Float, MetaData, String, Table, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.marketing_data import MarketingData
+from app.schemas.marketing_data import IngestionReport, MarketingDataCreate
+
+# Measured columns covered by the content hash and updated on upsert
+VALUE_COLUMNS = ("spend", "impressions", "clicks", "conversions", "revenue")
+
+# Temp staging table, dropped automatically when the transaction commits
+_staging_table = Table(
+    "marketing_data_staging",
+    MetaData(),
+    Column("id", String, nullable=False),
+    Column("date", Date, nullable=False),
+    Column("channel", String, nullable=False),
+    *(Column(name, Float) for name in VALUE_COLUMNS),
+    Column("content_hash", String(32), nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+# Only rows that are new or whose hash changed leave the staging table; the
+# ON CONFLICT ... WHERE guards against rows changed concurrently since.
+_UPSERT_SQL = text(f"""
+WITH upserted AS (
+    INSERT INTO marketing_data (id, tenant_id, date, channel, {", ".join(VALUE_COLUMNS)}, content_hash)
+    SELECT s.id, :tenant_id, s.date, s.channel, {", ".join("s." + c for c in VALUE_COLUMNS)}, s.content_hash
+    FROM marketing_data_staging s
+    LEFT JOIN marketing_data m
+        ON m.tenant_id = :tenant_id AND m.date = s.date AND m.channel = s.channel
+    WHERE m.content_hash IS DISTINCT FROM s.content_hash
+    ON CONFLICT (tenant_id, date, channel) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in VALUE_COLUMNS)},
+        content_hash = EXCLUDED.content_hash,
+        updated_at = now()
+    WHERE marketing_data.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS inserted,
+    count(*) FILTER (WHERE NOT inserted) AS updated
+FROM upserted
+""")
+
+
+class IngestionMode(str, Enum):
+    """How uploaded rows are written"""
+    APPEND = "append"  # plain insert; fails on existing (tenant, date, channel) rows
+    UPSERT = "upsert"  # insert new keys, update changed rows, skip unchanged rows
+
+
+def compute_content_hash(row: MarketingDataCreate) -> str:
+    """
+    Hash the values identifying and measuring a row
+
+    Floats are hashed by repr so any change in value changes the hash.
+    """
+    parts = [row.date.isoformat(), row.channel]
+    parts.extend(repr(getattr(row, name)) for name in VALUE_COLUMNS)
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def dedupe_rows(rows: Sequence[MarketingDataCreate]) -> Tuple[List[MarketingDataCreate], int]:
+    """
+    Collapse rows sharing a (date, channel) key, keeping the last occurrence
+
+    Postgres rejects an upsert that touches the same key twice in one
+    statement, so duplicates within a batch are resolved here.
+    """
+    latest: Dict[Tuple, MarketingDataCreate] = {}
+    for row in rows:
+        latest[(row.date, row.channel)] = row
+    return list(latest.values()), len(rows) - len(latest)
+
+
+class IngestionService:
+    """
+    Writes tenant marketing data in bulk
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ingest(
+        self,
+        tenant_id: str,
+        rows: Sequence[MarketingDataCreate],
+        mode: IngestionMode = IngestionMode.UPSERT,
+    ) -> IngestionReport:
+        """
+        Ingest rows for a tenant in the given mode and commit
+        """
+        if mode == IngestionMode.UPSERT:
+            return self.upsert(tenant_id, rows)
+        return self.append(tenant_id, rows)
+
+    def append(self, tenant_id: str, rows: Sequence[MarketingDataCreate]) -> IngestionReport:
+        """
+        Insert all rows; raises IntegrityError if a key already exists
+        """
+        if rows:
+            self.db.execute(
+                insert(MarketingData),
+                [self._row_values(row, tenant_id=tenant_id) for row in rows],
+            )
+        self.db.commit()
+        return IngestionReport(mode=IngestionMode.APPEND.value, rows_processed=len(rows), inserted=len(rows))
+
+    def upsert(self, tenant_id: str, rows: Sequence[MarketingDataCreate]) -> IngestionReport:
+        """
+        Upsert rows keyed on (tenant_id, date, channel)
+
+        The batch is staged into a temp table and merged with one
+        INSERT ... ON CONFLICT DO UPDATE that only writes new or changed rows.
+        """
+        unique_rows, duplicates = dedupe_rows(rows)
+        if not unique_rows:
+            return IngestionReport(mode=IngestionMode.UPSERT.value, rows_processed=len(rows),
+                                   duplicates_in_batch=duplicates)
+
+        connection = self.db.connection()
+        _staging_table.create(connection)
+        self.db.execute(insert(_staging_table), [self._row_values(row) for row in unique_rows])
+        counts = self.db.execute(_UPSERT_SQL, {"tenant_id": tenant_id}).one()
+        self.db.commit()
+
+        inserted, updated = counts.inserted, counts.updated
+        return IngestionReport(
+            mode=IngestionMode.UPSERT.value,
+            rows_processed=len(rows),
+            inserted=inserted,
+            updated=updated,
+            unchanged=len(unique_rows) - inserted - updated,
+            duplicates_in_batch=duplicates,
+        )
+
+    @staticmethod
+    def _row_values(row: MarketingDataCreate, **extra) -> Dict:
+        values = row.model_dump()
+        values["id"] = str(uuid.uuid4())
+        values["content_hash"] = compute_content_hash(row)
+        values.update(extra)
+        return values
@@ -0,0 +1,464 @@
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.analysis_job import AnalysisJob
+from app.models.marketing_data import MarketingData
+from app.schemas.marketing_data import AnalysisResult, ChannelAttribution, MMMResults, ModelAccuracy
+from app.utils.memory import (
+    MB,
+    PeakRSSMonitor,
+    allocate_array,
+    apply_memory_limit,
+    current_rss_bytes,
+    peak_rss_bytes,
+)
+
+# Hyperparameter grid searched per channel. Half saturation is expressed as a
+# multiple of the channel's mean adstocked spend so one grid fits any budget.
+DEFAULT_DECAY_GRID = (0.0, 0.2, 0.4, 0.6, 0.8)
+DEFAULT_HALF_SATURATION_GRID = (0.5, 1.0, 2.0)
+
+# Coordinate-descent passes over channels after the shared grid search
+DEFAULT_REFINEMENT_PASSES = 2
+
+# Columns produced by control_matrix()
+N_CONTROLS = 6
+
+_FLOAT_BYTES = 8
+
+
+def geometric_adstock(spend: np.ndarray, decay, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Carry-over effect along axis 0: a[t] = spend[t] + decay * a[t-1]
+
+    spend is (n_days,) or (n_days, n_series); decay is a scalar or one value
+    per series. Only one row is held as a temporary, so out may be a
+    memory-mapped array.
+    """
+    spend = np.asarray(spend, dtype=np.float64)
+    decay = np.asarray(decay, dtype=np.float64)
+    out = np.empty_like(spend) if out is None else out
+    carry = np.zeros(spend.shape[1:], dtype=np.float64)
+    for t in range(spend.shape[0]):
+        carry = spend[t] + decay * carry
+        out[t] = carry
+    return out
+
+
+def hill_saturation(adstocked: np.ndarray, half_saturation, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Diminishing returns: response is 0.5 when adstocked spend equals half_saturation
+
+    Computed as 1 - h / (x + h) so it can run in place (out=adstocked)
+    without a full-size temporary.
+    """
+    out = np.add(adstocked, half_saturation, out=out)
+    np.divide(half_saturation, out, out=out)
+    return np.subtract(1.0, out, out=out)
+
+
+def half_saturation_point(adstocked: np.ndarray, multiple) -> np.ndarray:
+    """
+    Absolute half-saturation point for a multiple of mean adstocked spend
+    """
+    mean = adstocked.mean(axis=0)
+    return np.asarray(multiple, dtype=np.float64) * np.where(mean > 0, mean, 1.0)
+
+
+def control_matrix(n_days: int, start: date) -> np.ndarray:
+    """
+    Baseline regressors: intercept, linear trend, weekly and yearly seasonality
+    """
+    t = np.arange(n_days, dtype=np.float64)
+    weekday = (t + start.weekday()) * (2 * np.pi / 7)
+    yearday = (t + start.timetuple().tm_yday) * (2 * np.pi / 365.25)
+    return np.column_stack([
+        np.ones(n_days),
+        t / max(n_days, 1),
+        np.sin(weekday), np.cos(weekday),
+        np.sin(yearday), np.cos(yearday),
+    ])
+
+
+def build_hyperparameter_grid(
+    decays: Sequence[float] = DEFAULT_DECAY_GRID,
+    half_saturations: Sequence[float] = DEFAULT_HALF_SATURATION_GRID,
+) -> List[Tuple[float, float]]:
+    return [(d, h) for d in decays for h in half_saturations]
+
+
+def transform_media(
+    spend: np.ndarray, grid: Sequence[Tuple[float, float]], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Adstock + saturation of every channel under every grid point
+
+    Returns an array of shape (n_grid, n_days, n_channels).
+    """
+    n_days, n_channels = spend.shape
+    features = np.empty((len(grid), n_days, n_channels), dtype=np.float64) if out is None else out
+    for g, (decay, multiple) in enumerate(grid):
+        adstocked = geometric_adstock(spend, decay, out=features[g])
+        hill_saturation(adstocked, half_saturation_point(adstocked, multiple), out=adstocked)
+    return features
+
+
+def channel_candidates(
+    spend_column: np.ndarray, grid: Sequence[Tuple[float, float]], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Adstock + saturation of one channel under every grid point, shape (n_days, n_grid)
+    """
+    decays = np.array([decay for decay, _ in grid], dtype=np.float64)
+    multiples = np.array([multiple for _, multiple in grid], dtype=np.float64)
+    tiled = np.broadcast_to(spend_column[:, None], (spend_column.shape[0], len(grid)))
+    adstocked = geometric_adstock(tiled, decays, out=out)
+    return hill_saturation(adstocked, half_saturation_point(adstocked, multiples), out=adstocked)
+
+
+class FitMemoryEstimate:
+    """
+    Array sizes for an MMM fit, computed before any matrix is built
+    """
+    __slots__ = ("n_days", "n_channels", "n_grid", "candidate_bytes", "design_matrix_bytes", "series_bytes")
+
+    def __init__(self, n_days: int, n_channels: int, n_grid: int):
+        self.n_days = n_days
+        self.n_channels = n_channels
+        self.n_grid = n_grid
+        # Every channel under every grid point, if materialized at once
+        self.candidate_bytes = n_grid * n_days * n_channels * _FLOAT_BYTES
+        self.design_matrix_bytes = n_days * (N_CONTROLS + n_channels) * _FLOAT_BYTES
+        # Spend, best media block, revenue, fitted values and controls
+        self.series_bytes = n_days * (2 * n_channels + 2 + N_CONTROLS) * _FLOAT_BYTES
+
+    def grid_chunk_size(self, block_bytes: int) -> int:
+        """Grid points per chunk in the shared search so one chunk fits block_bytes"""
+        slice_bytes = self.n_days * self.n_channels * _FLOAT_BYTES
+        return max(1, min(self.n_grid, block_bytes // max(slice_bytes, 1)))
+
+    def channel_chunk_size(self, block_bytes: int) -> int:
+        """Grid points per chunk when refining a single channel"""
+        return max(1, min(self.n_grid, block_bytes // max(self.n_days * _FLOAT_BYTES, 1)))
+
+    def resident_bytes(self, block_bytes: int) -> int:
+        """
+        Expected peak of in-memory arrays when blocks are capped at block_bytes
+
+        Blocks larger than block_bytes are memory-mapped and not counted.
+        """
+        candidate_block = min(self.candidate_bytes, self.grid_chunk_size(block_bytes)
+                              * self.n_days * self.n_channels * _FLOAT_BYTES)
+        return sum(
+            nbytes for nbytes in (candidate_block, self.design_matrix_bytes) if nbytes <= block_bytes
+        ) + self.series_bytes
+
+
+def estimate_fit_memory(n_days: int, n_channels: int, n_grid: int) -> FitMemoryEstimate:
+    return FitMemoryEstimate(n_days, n_channels, n_grid)
+
+
+def _normal_equations(X: np.ndarray, y: np.ndarray, row_chunk: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    X'X and X'y accumulated over row chunks, so X can be memory-mapped
+    """
+    n_cols = X.shape[1]
+    gram = np.zeros((n_cols, n_cols), dtype=np.float64)
+    xty = np.zeros(n_cols, dtype=np.float64)
+    for lo in range(0, X.shape[0], row_chunk):
+        block = np.asarray(X[lo:lo + row_chunk])
+        gram += block.T @ block
+        xty += block.T @ y[lo:lo + row_chunk]
+    return gram, xty
+
+
+def _least_squares(X: np.ndarray, y: np.ndarray, yy: float, row_chunk: int) -> Tuple[np.ndarray, float]:
+    """
+    Solve least squares through the normal equations; returns (coef, SSE)
+    """
+    gram, xty = _normal_equations(X, y, row_chunk)
+    coef, _, _, _ = np.linalg.lstsq(gram, xty, rcond=None)
+    sse = yy - 2 * coef @ xty + coef @ gram @ coef
+    return coef, max(float(sse), 0.0)
+
+
+def fit_mmm(
+    channels: Sequence[str],
+    spend: np.ndarray,
+    revenue: np.ndarray,
+    start: date,
+    grid: Optional[Sequence[Tuple[float, float]]] = None,
+    refinement_passes: int = DEFAULT_REFINEMENT_PASSES,
+    max_block_bytes: Optional[int] = None,
+    spill_dir: Optional[str] = None,
+) -> MMMResults:
+    """
+    Fit a marketing mix model on daily spend (n_days, n_channels) and revenue
+
+    Picks the best shared (decay, half saturation) grid point, then refines
+    each channel's hyperparameters by coordinate descent before the final
+    least-squares fit.
+
+    Candidate features are built in grid chunks of at most max_block_bytes
+    (ANALYSIS_MATRIX_BUDGET_MB by default); any single block or design
+    matrix larger than that is memory-mapped into spill_dir.
+    """
+    grid = list(grid) if grid is not None else build_hyperparameter_grid()
+    block_bytes = max_block_bytes if max_block_bytes is not None else settings.ANALYSIS_MATRIX_BUDGET_MB * MB
+    n_days, n_channels = spend.shape
+    estimate = estimate_fit_memory(n_days, n_channels, len(grid))
+    n_cols = N_CONTROLS + n_channels
+    row_chunk = max(1, block_bytes // (n_cols * _FLOAT_BYTES))
+    yy = float(revenue @ revenue)
+
+    X = allocate_array((n_days, n_cols), block_bytes, spill_dir)
+    X[:, :N_CONTROLS] = control_matrix(n_days, start)
+    best_media = allocate_array((n_days, n_channels), block_bytes, spill_dir)
+
+    best_sse, best_g = np.inf, 0
+    chunk = estimate.grid_chunk_size(block_bytes)
+    for lo in range(0, len(grid), chunk):
+        grid_chunk = grid[lo:lo + chunk]
+        block = transform_media(
+            spend, grid_chunk,
+            out=allocate_array((len(grid_chunk), n_days, n_channels), block_bytes, spill_dir),
+        )
+        for j in range(len(grid_chunk)):
+            X[:, N_CONTROLS:] = block[j]
+            _, sse = _least_squares(X, revenue, yy, row_chunk)
+            if sse < best_sse:
+                best_sse, best_g = sse, lo + j
+                best_media[:] = block[j]
+        del block
+    choice = [best_g] * n_channels
+    X[:, N_CONTROLS:] = best_media
+    del best_media
+
+    chunk = estimate.channel_chunk_size(block_bytes)
+    best_column = np.empty(n_days, dtype=np.float64)
+    for _ in range(refinement_passes):
+        changed = False
+        for c in range(n_channels):
+            best_column[:] = X[:, N_CONTROLS + c]
+            for lo in range(0, len(grid), chunk):
+                grid_chunk = grid[lo:lo + chunk]
+                candidates = channel_candidates(
+                    spend[:, c], grid_chunk,
+                    out=allocate_array((n_days, len(grid_chunk)), block_bytes, spill_dir),
+                )
+                for j in range(len(grid_chunk)):
+                    if lo + j == choice[c]:
+                        continue
+                    X[:, N_CONTROLS + c] = candidates[:, j]
+                    _, sse = _least_squares(X, revenue, yy, row_chunk)
+                    if sse < best_sse:
+                        best_sse, choice[c], changed = sse, lo + j, True
+                        best_column[:] = candidates[:, j]
+                del candidates
+            X[:, N_CONTROLS + c] = best_column
+        if not changed:
+            break
+
+    coef, sse = _least_squares(X, revenue, yy, row_chunk)
+    fitted = np.empty(n_days, dtype=np.float64)
+    for lo in range(0, n_days, row_chunk):
+        fitted[lo:lo + row_chunk] = np.asarray(X[lo:lo + row_chunk]) @ coef
+    media_revenue = coef[N_CONTROLS:] * np.asarray(X[:, N_CONTROLS:]).sum(axis=0)
+    total_fitted = fitted.sum() or 1.0
+    del X
+
+    attribution = []
+    for c, channel in enumerate(channels):
+        decay, multiple = grid[choice[c]]
+        channel_spend = spend[:, c].sum()
+        attribution.append(ChannelAttribution(
+            channel=channel,
+            contribution=round(100 * media_revenue[c] / total_fitted, 2),
+            roi=round(media_revenue[c] / channel_spend, 3) if channel_spend else None,
+            adstock_decay=decay,
+            half_saturation=multiple,
+        ))
+    attribution.append(ChannelAttribution(
+        channel="Base",
+        contribution=round(100 * (total_fitted - media_revenue.sum()) / total_fitted, 2),
+    ))
+
+    total_variance = float(((revenue - revenue.mean()) ** 2).sum())
+    nonzero = revenue != 0
+    mape = float(np.mean(np.abs((revenue[nonzero] - fitted[nonzero]) / revenue[nonzero]))) if nonzero.any() else 0.0
+    return MMMResults(
+        channel_attribution=attribution,
+        model_accuracy=ModelAccuracy(
+            r_squared=round(1 - sse / total_variance, 4) if total_variance else 0.0,
+            mape=round(100 * mape, 2),
+        ),
+    )
+
+
+def new_analysis_id() -> str:
+    return f"mmm_{uuid.uuid4().hex[:12]}"
+
+
+class MMMService:
+    """
+    Runs marketing mix models on a tenant's stored marketing data
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_tenant_data(self, tenant_id: str) -> Tuple[List[str], date, np.ndarray, np.ndarray]:
+        """
+        Pivot a tenant's rows into daily spend (n_days, n_channels) and revenue
+
+        Days without rows count as zero spend so adstock sees a contiguous series.
+        """
+        rows = (
+            self.db.query(MarketingData.date, MarketingData.channel, MarketingData.spend, MarketingData.revenue)
+            .filter(MarketingData.tenant_id == tenant_id)
+            .all()
+        )
+        if not rows:
+            raise ValueError(f"No marketing data for tenant {tenant_id}")
+
+        channels = sorted({row.channel for row in rows})
+        channel_index: Dict[str, int] = {channel: i for i, channel in enumerate(channels)}
+        start = min(row.date for row in rows)
+        n_days = (max(row.date for row in rows) - start).days + 1
+
+        spend = np.zeros((n_days, len(channels)), dtype=np.float64)
+        revenue = np.zeros(n_days, dtype=np.float64)
+        for row in rows:
+            day = (row.date - start).days
+            spend[day, channel_index[row.channel]] += row.spend
+            revenue[day] += row.revenue or 0.0
+        return channels, start, spend, revenue
+
+    def save_job(self, tenant_id: str, result: AnalysisResult) -> None:
+        """
+        Create or update the stored job for result and commit
+        """
+        self.db.merge(AnalysisJob(
+            id=result.analysis_id,
+            tenant_id=tenant_id,
+            status=result.status,
+            result=result.model_dump(mode="json"),
+        ))
+        self.db.commit()
+
+    def get_job(self, tenant_id: str, analysis_id: str) -> Optional[AnalysisResult]:
+        """
+        Return the tenant's stored job, or None if unknown or owned by another tenant
+        """
+        job = (
+            self.db.query(AnalysisJob)
+            .filter(AnalysisJob.id == analysis_id, AnalysisJob.tenant_id == tenant_id)
+            .first()
+        )
+        return AnalysisResult.model_validate(job.result) if job is not None else None
+
+    def run(self, tenant_id: str, grid: Optional[Sequence[Tuple[float, float]]] = None) -> MMMResults:
+        channels, start, spend, revenue = self.load_tenant_data(tenant_id)
+        return fit_mmm(channels, spend, revenue, start, grid=grid)
+
+    def run_job(
+        self,
+        tenant_id: str,
+        grid: Optional[Sequence[Tuple[float, float]]] = None,
+        isolate: Optional[bool] = None,
+        analysis_id: Optional[str] = None,
+    ) -> AnalysisResult:
+        """
+        Run an analysis job under the configured memory limits
+
+        Matrix sizes are estimated first and jobs that cannot fit are
+        rejected without running. By default the fit runs in a fresh worker
+        process whose heap is capped at ANALYSIS_MEMORY_LIMIT_MB, so an
+        oversized job fails on its own instead of exhausting the shared
+        worker; the estimate must fit in the limit less the worker's baseline
+        memory. peak_memory_mb is the peak RSS increase over the start of the
+        fit, for isolated and inline jobs alike.
+        """
+        result = AnalysisResult(
+            analysis_id=analysis_id or new_analysis_id(),
+            status="completed",
+            created_at=datetime.now(timezone.utc),
+        )
+        try:
+            channels, start, spend, revenue = self.load_tenant_data(tenant_id)
+        except ValueError as exc:
+            return result.model_copy(update={"status": "failed", "message": str(exc)})
+
+        grid = list(grid) if grid is not None else build_hyperparameter_grid()
+        isolate = settings.ANALYSIS_ISOLATE_JOBS if isolate is None else isolate
+        block_bytes = settings.ANALYSIS_MATRIX_BUDGET_MB * MB
+        limit_bytes = settings.ANALYSIS_MEMORY_LIMIT_MB * MB
+        # Isolated workers spend part of their limit on imports before fitting
+        budget_bytes = limit_bytes - (settings.ANALYSIS_WORKER_BASELINE_MB * MB if isolate else 0)
+        estimated_bytes = estimate_fit_memory(spend.shape[0], spend.shape[1], len(grid)).resident_bytes(block_bytes)
+
+        result = result.model_copy(update={"estimated_memory_mb": round(estimated_bytes / MB, 1)})
+        if estimated_bytes > budget_bytes:
+            return result.model_copy(update={
+                "status": "failed",
+                "message": f"Analysis needs an estimated {estimated_bytes // MB} MB, above the "
+                           f"{max(budget_bytes, 0) // MB} MB available to a job under the "
+                           f"{settings.ANALYSIS_MEMORY_LIMIT_MB} MB limit",
+            })
+
+        args = (channels, spend, revenue, start, grid, block_bytes, settings.ANALYSIS_SPILL_DIR)
+        try:
+            if isolate:
+                results, peak_bytes = _run_isolated(args, limit_bytes)
+            else:
+                with PeakRSSMonitor() as monitor:
+                    results = fit_mmm(*args[:5], max_block_bytes=block_bytes, spill_dir=args[6])
+                peak_bytes = monitor.increase_bytes
+        except (MemoryError, BrokenProcessPool):
+            return result.model_copy(update={
+                "status": "failed",
+                "message": f"Analysis exceeded the {settings.ANALYSIS_MEMORY_LIMIT_MB} MB job memory limit",
+            })
+
+        return result.model_copy(update={
+            "results": results,
+            "peak_memory_mb": round(peak_bytes / MB, 1) if peak_bytes is not None else None,
+        })
+
+
+def _fit_worker(channels, spend, revenue, start, grid, block_bytes, spill_dir) -> Tuple[MMMResults, Optional[int]]:
+    """
+    Worker process entry point: fit, then report the job's peak RSS increase
+
+    RSS is recorded after the worker's imports, so like inline jobs the
+    result excludes the interpreter, numpy and the app modules.
+    """
+    start_bytes = current_rss_bytes()
+    results = fit_mmm(channels, spend, revenue, start, grid=grid, max_block_bytes=block_bytes, spill_dir=spill_dir)
+    peak_bytes = peak_rss_bytes()
+    if start_bytes is None or peak_bytes is None:
+        return results, None
+    return results, max(peak_bytes - start_bytes, 0)
+
+
+def _run_isolated(args: tuple, limit_bytes: int) -> Tuple[MMMResults, Optional[int]]:
+    """
+    Run one fit in a fresh spawned process with its heap capped at limit_bytes
+
+    A fresh process per job keeps ru_maxrss specific to the job and returns
+    all of its memory to the OS when it exits.
+    """
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=apply_memory_limit,
+        initargs=(limit_bytes,),
+    ) as executor:
+        return executor.submit(_fit_worker, *args).result()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 2**20
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Resident set size of this process, or None where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of this process since it started
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def apply_memory_limit(limit_bytes: int) -> None:
+    """
+    Cap this process's heap (RLIMIT_DATA) so an oversized job fails with MemoryError
+
+    RLIMIT_DATA counts private allocations but not shared file mappings, so
+    arrays spilled with allocate_array() stay usable under the cap. Ignored
+    on platforms without the limit.
+    """
+    if resource is None or not hasattr(resource, "RLIMIT_DATA"):
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+    soft = limit_bytes if hard == resource.RLIM_INFINITY else min(limit_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_DATA, (soft, hard))
+
+
+def allocate_array(shape: Tuple[int, ...], max_bytes: int, spill_dir: Optional[str] = None) -> np.ndarray:
+    """
+    Allocate a float64 array in memory, or memory-mapped to a temp file if it exceeds max_bytes
+
+    The temp file is unlinked immediately on POSIX, so its space is released
+    as soon as the array is garbage collected.
+    """
+    nbytes = int(np.prod(shape)) * 8
+    if nbytes <= max_bytes:
+        return np.empty(shape, dtype=np.float64)
+    fd, path = tempfile.mkstemp(dir=spill_dir, prefix="mmm-", suffix=".dat")
+    try:
+        return np.memmap(path, dtype=np.float64, mode="w+", shape=shape)
+    finally:
+        os.close(fd)
+        if os.name == "posix":
+            os.unlink(path)
+
+
+class PeakRSSMonitor:
+    """
+    Samples this process's RSS on a background thread to find a job's peak
+
+    Used when a job runs inline; isolated workers report ru_maxrss instead.
+    The process RSS includes everything else it holds, so a job's own usage
+    is increase_bytes, the peak above the RSS when monitoring started.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_bytes = current_rss_bytes() or 0
+        self.peak_bytes = self.start_bytes
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = current_rss_bytes()
+            if rss is not None and rss > self.peak_bytes:
+                self.peak_bytes = rss
+
+    def __enter__(self) -> "PeakRSSMonitor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        rss = current_rss_bytes()
+        if rss is not None and rss > self.peak_bytes:
+            self.peak_bytes = rss
+
+    @property
+    def increase_bytes(self) -> int:
+        return self.peak_bytes - self.start_bytes
@@ -0,0 +1,38 @@
+from typing import Any, Optional, Dict
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+# ORJSONResponse is used as the application's default response class. It is
+# re-exported here so routers have a single place to import response helpers.
+__all__ = ["ORJSONResponse", "PreSerializedJSONResponse", "typed_json_response"]
+
+
+class PreSerializedJSONResponse(Response):
+    """
+    JSON response for content that has already been serialized to bytes
+
+    Used for large payloads (exports, attribution tables) where the bytes are
+    produced directly by a precompiled pydantic TypeAdapter, skipping both
+    response_model re-validation and jsonable_encoder.
+    """
+    media_type = "application/json"
+
+
+def typed_json_response(
+    adapter: TypeAdapter,
+    payload: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> PreSerializedJSONResponse:
+    """
+    Serialize payload with a precompiled TypeAdapter and wrap it in a response
+
+    Fields are written by alias, as FastAPI does for response_model.
+    Payload must already match the adapter's type. ORM rows should be
+    converted first with adapter.validate_python(rows, from_attributes=True).
+    """
+    return PreSerializedJSONResponse(
+        content=adapter.dump_json(payload, by_alias=True),
+        status_code=status_code,
+        headers=headers,
+    )
@@ -0,0 +1,256 @@
+"""
+Scale-test harness for ingestion, dashboard, export and analysis workloads
+
+For each scale (number of tenants) the harness grows the synthetic tenant
+set to that size through the ingestion path, then runs dashboard, export
+and analysis workloads against a sample of tenants. It reports throughput,
+latency and memory per stage. Scales run in ascending order and build on
+each other, so each ingest stage loads only the tenants added since the
+previous scale.
+
+Stages and the code paths they exercise:
+
+- ingest: IngestionService upsert, as used by /tenant/data/upload
+- dashboard: a stand-in per-channel aggregate query. /tenant/dashboard/metrics
+  still serves mock data, so it cannot be measured against the database yet.
+- export: the real /tenant/data/export handler, called through a TestClient
+  so routing, query, serialization and response rendering are all timed
+- analysis: MMMService.run_job with the shipped settings, as run by
+  /tenant/analysis/run. With ANALYSIS_ISOLATE_JOBS (the default) each job
+  starts a memory-capped worker process, and that start-up is timed.
+- analysis_inline (with --inline-analysis): the same jobs run in-process,
+  to separate fit time from worker start-up
+
+Run from the backend directory against a scratch database:
+    python -m benchmarks.scale_harness --scales 10,1000,10000 --days 365 \\
+        --database-url postgresql://...
+"""
+import argparse
+import json
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.marketing_data import MarketingData
+from app.routers import tenant
+from app.services.mmm_service import MMMService
+from app.utils.db import get_db
+from app.utils.memory import MB, current_rss_bytes, peak_rss_bytes
+from app.utils.serialization import ORJSONResponse
+from benchmarks.synthetic_data import (
+    generate_tenant,
+    load_tenant,
+    make_session_factory,
+    reset_synthetic_data,
+    tenant_id_for,
+)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    rss = current_rss_bytes()
+    return (rss if rss is not None else peak_rss_bytes() or 0) / MB
+
+
+def peak_rss_mb() -> float:
+    return (peak_rss_bytes() or 0) / MB
+
+
+def make_tenant_client(db: Session) -> TestClient:
+    """
+    Client for the tenant router, served like app.main and bound to db
+    """
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(tenant.router, prefix="/tenant")
+
+    def override_get_db() -> Generator[Session, None, None]:
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+class StageResult:
+    """Timing and memory for one workload stage at one scale"""
+    def __init__(self, scale: int, stage: str):
+        self.scale = scale
+        self.stage = stage
+        self.latencies: List[float] = []
+        self.rows = 0
+        self.seconds = 0.0
+        self.rss_start_mb = current_rss_mb()
+        self.rss_end_mb = self.rss_start_mb
+        self.peak_rss_mb = peak_rss_mb()
+        self.extra: Dict[str, Any] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        ops = len(self.latencies)
+        latencies_ms = np.array(self.latencies) * 1000 if ops else np.zeros(1)
+        return {
+            "scale": self.scale,
+            "stage": self.stage,
+            "operations": ops,
+            "rows": self.rows,
+            "seconds": round(self.seconds, 3),
+            "ops_per_s": round(ops / self.seconds, 1) if self.seconds else 0.0,
+            "rows_per_s": round(self.rows / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+            "rss_delta_mb": round(self.rss_end_mb - self.rss_start_mb, 1),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            **self.extra,
+        }
+
+
+def run_stage(scale: int, stage: str, items: Iterable, fn: Callable[[Any], int]) -> StageResult:
+    """
+    Time fn over items; fn returns the number of rows it handled
+    """
+    result = StageResult(scale, stage)
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        result.rows += fn(item)
+        result.latencies.append(time.perf_counter() - t0)
+    result.seconds = time.perf_counter() - started
+    result.rss_end_mb = current_rss_mb()
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+def sample_indices(n_tenants: int, sample: int) -> List[int]:
+    """Evenly spaced tenant indices, so samples cover old and new tenants"""
+    if sample >= n_tenants:
+        return list(range(n_tenants))
+    return sorted(set(np.linspace(0, n_tenants - 1, sample).astype(int).tolist()))
+
+
+def run_analysis_stage(db: Session, scale: int, stage_name: str, sample: List[int],
+                       truths: Dict[int, Dict[str, Any]], isolate: Optional[bool]) -> Dict[str, Any]:
+    """
+    Run analysis jobs for the sampled tenants and score them against ground truth
+
+    isolate=None uses the shipped ANALYSIS_ISOLATE_JOBS setting.
+    """
+    decay_hits: List[bool] = []
+    roi_errors: List[float] = []
+    job_increases: List[float] = []
+
+    def analysis(index: int) -> int:
+        job = MMMService(db).run_job(tenant_id_for(index), isolate=isolate)
+        if job.results is None:
+            raise RuntimeError(f"Analysis failed for {tenant_id_for(index)}: {job.message}")
+        job_increases.append(job.peak_memory_mb or 0.0)
+        fit = job.results
+        for attribution in fit.channel_attribution:
+            expected: Optional[Dict[str, float]] = truths[index]["channels"].get(attribution.channel)
+            if expected is None:
+                continue
+            decay_hits.append(attribution.adstock_decay == expected["adstock_decay"])
+            roi_errors.append(abs((attribution.roi or 0.0) - expected["roi"]) / expected["roi"])
+        return len(fit.channel_attribution) - 1
+
+    stage = run_stage(scale, stage_name, sample, analysis)
+    stage.extra = {
+        "decay_recovery": float(np.mean(decay_hits)) if decay_hits else 0.0,
+        "median_roi_error": float(np.median(roi_errors)) if roi_errors else 0.0,
+        # Each job reports its peak RSS increase over the start of its fit
+        "max_job_rss_increase_mb": max(job_increases) if job_increases else 0.0,
+    }
+    return stage.as_dict()
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    columns = ["scale", "stage", "operations", "rows", "seconds", "ops_per_s", "rows_per_s",
+               "p50_ms", "p95_ms", "rss_delta_mb", "peak_rss_mb"]
+    print("  ".join(f"{c:>12}" for c in columns))
+    for row in results:
+        print("  ".join(f"{row[c]:>12}" for c in columns))
+    for row in results:
+        if "decay_recovery" in row:
+            print(f"scale {row['scale']} {row['stage']}: adstock decay recovered for {row['decay_recovery']:.0%} of channels, "
+                  f"median ROI error {row['median_roi_error']:.1%}, max job RSS increase {row['max_job_rss_increase_mb']} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run scale tests at increasing tenant counts")
+    parser.add_argument("--scales", default="10,1000,10000",
+                        type=lambda s: sorted(int(x) for x in s.split(",")))
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2022, 1, 1))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--query-sample", type=int, default=500,
+                        help="Tenants per scale for dashboard and export stages")
+    parser.add_argument("--analysis-sample", type=int, default=20,
+                        help="Tenants per scale for the analysis stage")
+    parser.add_argument("--inline-analysis", action="store_true",
+                        help="Also run the analysis jobs in-process as a separate stage")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    SessionLocal = make_session_factory(args.database_url)
+    results: List[Dict[str, Any]] = []
+
+    with SessionLocal() as db:
+        client = make_tenant_client(db)
+        reset_synthetic_data(db)
+        loaded = 0
+        for scale in args.scales:
+            def ingest(index: int) -> int:
+                tenant, records, _ = generate_tenant(index, args.days, args.start, args.seed)
+                return load_tenant(db, tenant, records).rows_processed
+
+            results.append(run_stage(scale, "ingest", range(loaded, scale), ingest).as_dict())
+            loaded = scale
+
+            def dashboard(index: int) -> int:
+                # Stand-in query: the dashboard route does not read the database yet
+                rows = (
+                    db.query(
+                        MarketingData.channel,
+                        func.sum(MarketingData.spend),
+                        func.sum(MarketingData.impressions),
+                        func.sum(MarketingData.clicks),
+                        func.sum(MarketingData.revenue),
+                    )
+                    .filter(MarketingData.tenant_id == tenant_id_for(index))
+                    .group_by(MarketingData.channel)
+                    .all()
+                )
+                return len(rows)
+
+            def export(index: int) -> int:
+                response = client.get("/tenant/data/export", params={"tenant_id": tenant_id_for(index)})
+                response.raise_for_status()
+                db.expunge_all()
+                return len(response.json())
+
+            query_sample = sample_indices(scale, args.query_sample)
+            results.append(run_stage(scale, "dashboard", query_sample, dashboard).as_dict())
+            results.append(run_stage(scale, "export", query_sample, export).as_dict())
+
+            # Ground truth is regenerated up front so it stays out of the timings
+            analysis_sample = sample_indices(scale, args.analysis_sample)
+            truths = {i: generate_tenant(i, args.days, args.start, args.seed)[2] for i in analysis_sample}
+            analysis_stages = [("analysis", None)]
+            if args.inline_analysis:
+                analysis_stages.append(("analysis_inline", False))
+            for stage_name, isolate in analysis_stages:
+                results.append(run_analysis_stage(db, scale, stage_name, analysis_sample, truths, isolate))
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
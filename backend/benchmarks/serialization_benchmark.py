@@ -0,0 +1,120 @@
+"""
+Serialization throughput benchmark for MarketingDataInDB list payloads
+
+Compares the previous response path (jsonable_encoder + stdlib json, as used
+by JSONResponse for untyped routes) with the two paths the API now serves:
+
+- response_model routes: FastAPI's serialize_response (pydantic-core
+  validation and serialization) rendered by ORJSONResponse
+- /tenant/data/export: ORM rows validated with the precompiled
+  MarketingDataInDBListAdapter and dumped by typed_json_response
+
+Run from the backend directory:
+    python -m benchmarks.serialization_benchmark [--rows 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.marketing_data import MarketingData
+from app.schemas.marketing_data import MarketingDataInDB, MarketingDataInDBListAdapter
+from app.utils.serialization import ORJSONResponse, typed_json_response
+
+CHANNELS = ["Facebook", "Google", "TV", "Radio", "Email"]
+
+RESPONSE_FIELD = create_response_field(name="response", type_=List[MarketingDataInDB])
+
+
+def build_orm_rows(n: int) -> List[MarketingData]:
+    """Build n transient MarketingData rows with realistic field values"""
+    start = date(2020, 1, 1)
+    created = datetime(2023, 3, 13, tzinfo=timezone.utc)
+    return [
+        MarketingData(
+            id=f"row-{i}",
+            tenant_id="acme",
+            date=start + timedelta(days=i // len(CHANNELS)),
+            channel=CHANNELS[i % len(CHANNELS)],
+            spend=1000.0 + i,
+            impressions=100000.0 + i * 10,
+            clicks=2000.0 + i,
+            conversions=50.0 + (i % 7),
+            revenue=3500.0 + i * 1.5,
+            created_at=created,
+        )
+        for i in range(n)
+    ]
+
+
+def before(rows: List[MarketingDataInDB]) -> bytes:
+    # Untyped route: jsonable_encoder, then JSONResponse.render
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+def response_model(rows: List[MarketingDataInDB]) -> bytes:
+    # Typed route: FastAPI validates and serializes against response_model
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=rows))
+    return ORJSONResponse(content).body
+
+
+def export_before(orm_rows: List[MarketingData]) -> bytes:
+    # Export without the adapter: per-row model_validate, then the untyped path
+    return before([MarketingDataInDB.model_validate(row) for row in orm_rows])
+
+
+def export_route(orm_rows: List[MarketingData]) -> bytes:
+    # Same steps as tenant.export_marketing_data after the query
+    data = MarketingDataInDBListAdapter.validate_python(orm_rows, from_attributes=True)
+    return typed_json_response(MarketingDataInDBListAdapter, data).body
+
+
+def measure(fn: Callable[[list], bytes], rows: list, repeat: int) -> float:
+    """Return best-of-repeat wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    orm_rows = build_orm_rows(args.rows)
+    rows = MarketingDataInDBListAdapter.validate_python(orm_rows, from_attributes=True)
+    # (input, baseline, [(label, path)]) -- speedups are relative to the
+    # baseline for the same input
+    groups = [
+        (rows, ("jsonable_encoder + JSONResponse (before)", before),
+         [("response_model + ORJSONResponse", response_model)]),
+        (orm_rows, ("export: model_validate + jsonable_encoder", export_before),
+         [("export: adapter + typed_json_response", export_route)]),
+    ]
+
+    print(f"{'path':<44}{'seconds':>10}{'rows/s':>14}{'speedup':>10}")
+    for data, (base_name, base_fn), paths in groups:
+        # All paths must produce the same document
+        expected = json.loads(base_fn(data))
+        for name, fn in paths:
+            assert json.loads(fn(data)) == expected, name
+
+        baseline = measure(base_fn, data, args.repeat)
+        for name, fn in [(base_name, base_fn)] + paths:
+            elapsed = baseline if fn is base_fn else measure(fn, data, args.repeat)
+            print(f"{name:<44}{elapsed:>10.4f}{args.rows / elapsed:>14,.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Synthetic multi-tenant marketing data generator
+
+Generates tenants with daily per-channel spend, impressions, clicks and
+revenue. Revenue is built from a seasonal baseline plus each channel's
+adstocked, saturated spend using the same transforms as the MMM service, so
+a fit on the loaded data should recover the ground truth written alongside.
+
+Rows are loaded through IngestionService (the upload path).
+
+Run from the backend directory:
+    python -m benchmarks.synthetic_data --tenants 100 --days 730 \\
+        --database-url postgresql://... --ground-truth truth.json
+"""
+import argparse
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.analysis_job import AnalysisJob
+from app.models.marketing_data import MarketingData
+from app.models.tenant import Tenant
+from app.models.user import User  # noqa: F401  (registers the users table)
+from app.schemas.marketing_data import MarketingDataCreateListAdapter
+from app.services.ingestion_service import IngestionMode, IngestionService
+from app.services.mmm_service import (
+    DEFAULT_DECAY_GRID,
+    DEFAULT_HALF_SATURATION_GRID,
+    geometric_adstock,
+    half_saturation_point,
+    hill_saturation,
+)
+from app.utils.db import Base
+
+SYNTHETIC_TENANT_PREFIX = "synth-"
+
+# channel -> (cost per mille, click-through rate, flighted)
+CHANNEL_PROFILES: Dict[str, Tuple[float, float, bool]] = {
+    "Facebook": (8.0, 0.012, False),
+    "Google": (12.0, 0.035, False),
+    "TV": (25.0, 0.0, True),
+    "Radio": (6.0, 0.0, True),
+    "Display": (3.0, 0.004, False),
+    "YouTube": (10.0, 0.006, False),
+    "Email": (1.0, 0.02, False),
+    "Affiliate": (5.0, 0.015, False),
+}
+
+INDUSTRIES = ["Technology", "Retail", "Manufacturing", "Finance", "Healthcare", "Travel"]
+FEATURE_TIERS = [
+    ["dashboard", "data_upload", "basic_analysis"],
+    ["dashboard", "data_upload", "basic_analysis", "advanced_analysis"],
+    ["dashboard", "data_upload", "basic_analysis", "advanced_analysis", "recommendations"],
+]
+
+
+def tenant_id_for(index: int) -> str:
+    return f"{SYNTHETIC_TENANT_PREFIX}{index:05d}"
+
+
+def generate_spend(rng: np.random.Generator, n_days: int, start: date, flighted: bool) -> np.ndarray:
+    """
+    Daily spend with weekly and yearly seasonality
+
+    Always-on channels get occasional campaign pushes; flighted channels run
+    in bursts. Both give the spend the variation an MMM needs to identify
+    carry-over and saturation.
+    """
+    t = np.arange(n_days)
+    weekday = (t + start.weekday()) % 7
+    yearday = t + start.timetuple().tm_yday
+    level = rng.uniform(200, 5000)
+    weekly = 1 + 0.25 * np.where(weekday < 5, 1.0, -1.0) * rng.uniform(0.2, 1.0)
+    yearly = 1 + rng.uniform(0.1, 0.4) * np.sin(2 * np.pi * yearday / 365.25 + rng.uniform(0, 2 * np.pi))
+    spend = level * weekly * yearly * rng.lognormal(0, 0.25, n_days)
+    if flighted:
+        # Two to six week bursts separated by dark periods
+        on = np.zeros(n_days, dtype=bool)
+        day = int(rng.integers(0, 28))
+        while day < n_days:
+            length = int(rng.integers(14, 43))
+            on[day:day + length] = True
+            day += length + int(rng.integers(14, 57))
+        spend = np.where(on, spend * 2.5, 0.0)
+    else:
+        for _ in range(max(1, n_days // 60)):
+            day = int(rng.integers(0, n_days))
+            spend[day:day + int(rng.integers(5, 22))] *= rng.uniform(1.5, 3.0)
+    return spend
+
+
+def generate_tenant(
+    index: int, n_days: int, start: date, seed: int, noise: float = 0.05
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Generate one tenant: (tenant fields, marketing data records, ground truth)
+    """
+    rng = np.random.default_rng([seed, index])
+    tenant_id = tenant_id_for(index)
+    channels = sorted(rng.choice(list(CHANNEL_PROFILES), size=int(rng.integers(3, 7)), replace=False))
+
+    spend = np.column_stack([
+        generate_spend(rng, n_days, start, CHANNEL_PROFILES[channel][2]) for channel in channels
+    ])
+    decays = rng.choice(DEFAULT_DECAY_GRID, size=len(channels))
+    half_multiples = rng.choice(DEFAULT_HALF_SATURATION_GRID, size=len(channels))
+    adstocked = geometric_adstock(spend, decays)
+    response = hill_saturation(adstocked, half_saturation_point(adstocked, half_multiples))
+    # Revenue at full saturation, scaled so channel ROI lands roughly in 1-8x
+    betas = spend.mean(axis=0) * rng.uniform(2.0, 12.0, size=len(channels))
+    contributions = response * betas
+
+    t = np.arange(n_days)
+    yearday = t + start.timetuple().tm_yday
+    base_level = contributions.sum(axis=1).mean() * rng.uniform(0.3, 1.5)
+    baseline = base_level * (1 + 0.15 * t / n_days) * (1 + 0.1 * np.sin(2 * np.pi * yearday / 365.25))
+    revenue = baseline + contributions.sum(axis=1)
+    revenue *= rng.normal(1.0, noise, n_days)
+
+    # Baseline and noise are split evenly across the day's channel rows so
+    # per-day revenue sums to the generated total
+    other = (revenue - contributions.sum(axis=1)) / len(channels)
+    records = []
+    for c, channel in enumerate(channels):
+        cpm, ctr, _ = CHANNEL_PROFILES[channel]
+        impressions = spend[:, c] / cpm * 1000 * rng.lognormal(0, 0.1, n_days)
+        clicks = impressions * ctr * rng.lognormal(0, 0.1, n_days)
+        conversions = clicks * rng.uniform(0.01, 0.05)
+        for day in range(n_days):
+            records.append({
+                "date": start + timedelta(days=day),
+                "channel": channel,
+                "spend": round(float(spend[day, c]), 2),
+                "impressions": round(float(impressions[day])),
+                "clicks": round(float(clicks[day])) if ctr else None,
+                "conversions": round(float(conversions[day]), 2) if ctr else None,
+                "revenue": round(float(contributions[day, c] + other[day]), 2),
+            })
+
+    tenant = {
+        "id": tenant_id,
+        "name": f"Synthetic Tenant {index}",
+        "subdomain": tenant_id.replace("-", ""),
+        "industry": INDUSTRIES[index % len(INDUSTRIES)],
+        "features": FEATURE_TIERS[int(rng.integers(0, len(FEATURE_TIERS)))],
+    }
+    truth = {
+        "tenant_id": tenant_id,
+        "channels": {
+            channel: {
+                "adstock_decay": float(decays[c]),
+                "half_saturation": float(half_multiples[c]),
+                "roi": float(contributions[:, c].sum() / spend[:, c].sum()),
+            }
+            for c, channel in enumerate(channels)
+        },
+    }
+    return tenant, records, truth
+
+
+def generate_tenants(
+    n_tenants: int, n_days: int, start: date, seed: int
+) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]]:
+    for index in range(n_tenants):
+        yield generate_tenant(index, n_days, start, seed)
+
+
+def reset_synthetic_data(db: Session) -> None:
+    """
+    Delete all synthetic tenants with their marketing data and analysis jobs
+    """
+    db.execute(delete(AnalysisJob).where(AnalysisJob.tenant_id.startswith(SYNTHETIC_TENANT_PREFIX)))
+    db.execute(delete(MarketingData).where(MarketingData.tenant_id.startswith(SYNTHETIC_TENANT_PREFIX)))
+    db.execute(delete(Tenant).where(Tenant.id.startswith(SYNTHETIC_TENANT_PREFIX)))
+    db.commit()
+
+
+def load_tenant(db: Session, tenant: Dict[str, Any], records: List[Dict[str, Any]]):
+    """
+    Create the tenant row and ingest its records through the upsert path
+    """
+    db.merge(Tenant(**tenant))
+    db.commit()
+    rows = MarketingDataCreateListAdapter.validate_python(records)
+    return IngestionService(db).ingest(tenant["id"], rows, IngestionMode.UPSERT)
+
+
+def make_session_factory(database_url: str) -> sessionmaker:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate and load synthetic tenant marketing data")
+    parser.add_argument("--tenants", type=int, default=10)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2022, 1, 1))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--ground-truth", help="Write per-tenant ground truth to this JSON file")
+    parser.add_argument("--reset", action="store_true", help="Delete existing synthetic tenants first")
+    args = parser.parse_args()
+
+    SessionLocal = make_session_factory(args.database_url)
+    truths = []
+    with SessionLocal() as db:
+        if args.reset:
+            reset_synthetic_data(db)
+        for tenant, records, truth in generate_tenants(args.tenants, args.days, args.start, args.seed):
+            report = load_tenant(db, tenant, records)
+            truths.append(truth)
+            print(f"{tenant['id']}: inserted={report.inserted} updated={report.updated} "
+                  f"unchanged={report.unchanged}")
+
+    if args.ground_truth:
+        with open(args.ground_truth, "w") as f:
+            json.dump(truths, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
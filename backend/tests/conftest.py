@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.analysis_job import AnalysisJob  # noqa: F401
+from app.models.marketing_data import MarketingData  # noqa: F401
+from app.models.tenant import Tenant
+from app.models.user import User  # noqa: F401
+from app.utils.db import Base
+
+
+@pytest.fixture
+def session_factory():
+    """
+    Session factory for an in-memory SQLite database with acme and globex
+
+    Enough for code that only needs plain tables; Postgres-specific SQL is
+    tested against a real database instead.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        for tenant_id in ("acme", "globex"):
+            db.add(Tenant(id=tenant_id, name=tenant_id.title(), subdomain=tenant_id))
+        db.commit()
+    yield factory
+    engine.dispose()
@@ -0,0 +1,91 @@
+"""
+Upsert ingestion against a real PostgreSQL database
+
+Set TEST_DATABASE_URL to a scratch database to run these tests; tables are
+created if missing and the test tenant's rows are removed afterwards.
+"""
+import os
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.models.analysis_job import AnalysisJob  # noqa: F401
+from app.models.marketing_data import MarketingData
+from app.models.tenant import Tenant
+from app.models.user import User  # noqa: F401
+from app.schemas.marketing_data import MarketingDataCreate
+from app.services.ingestion_service import IngestionMode, IngestionService
+from app.utils.db import Base
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    tenant_id = f"test-{uuid.uuid4().hex[:8]}"
+    session.add(Tenant(id=tenant_id, name="Test", subdomain=tenant_id))
+    session.commit()
+    session.info["tenant_id"] = tenant_id
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.execute(delete(MarketingData).where(MarketingData.tenant_id == tenant_id))
+        session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+        session.commit()
+        session.close()
+        engine.dispose()
+
+
+def batch(overrides=None, extra=()):
+    rows = [
+        MarketingDataCreate(date=date(2024, 1, day), channel=channel, spend=100.0 * day, revenue=250.0 * day)
+        for day in (1, 2) for channel in ("TV", "Radio")
+    ]
+    for index, values in (overrides or {}).items():
+        rows[index] = rows[index].model_copy(update=values)
+    return rows + list(extra)
+
+
+def stored(db, tenant_id):
+    rows = db.query(MarketingData).filter(MarketingData.tenant_id == tenant_id).all()
+    return {(row.date, row.channel): (row.spend, row.revenue) for row in rows}
+
+
+def test_upsert_inserts_skips_unchanged_and_updates_changed_rows(db):
+    tenant_id = db.info["tenant_id"]
+    service = IngestionService(db)
+
+    first = service.ingest(tenant_id, batch(), IngestionMode.UPSERT)
+    assert (first.inserted, first.updated, first.unchanged) == (4, 0, 0)
+
+    again = service.ingest(tenant_id, batch(), IngestionMode.UPSERT)
+    assert (again.inserted, again.updated, again.unchanged) == (0, 0, 4)
+
+    added = MarketingDataCreate(date=date(2024, 1, 3), channel="TV", spend=300.0, revenue=900.0)
+    changed = service.ingest(tenant_id, batch({0: {"revenue": 999.0}}, [added]), IngestionMode.UPSERT)
+    assert (changed.inserted, changed.updated, changed.unchanged) == (1, 1, 3)
+    assert changed.rows_processed == 5
+
+    rows = stored(db, tenant_id)
+    assert len(rows) == 5
+    assert rows[(date(2024, 1, 1), "TV")] == (100.0, 999.0)
+    assert rows[(date(2024, 1, 1), "Radio")] == (100.0, 250.0)
+    assert rows[(date(2024, 1, 3), "TV")] == (300.0, 900.0)
+
+
+def test_upsert_keeps_last_duplicate_in_batch(db):
+    tenant_id = db.info["tenant_id"]
+    duplicate = MarketingDataCreate(date=date(2024, 1, 1), channel="TV", spend=1.0, revenue=2.0)
+    report = IngestionService(db).ingest(tenant_id, batch(extra=[duplicate]), IngestionMode.UPSERT)
+
+    assert (report.inserted, report.duplicates_in_batch) == (4, 1)
+    assert stored(db, tenant_id)[(date(2024, 1, 1), "TV")] == (1.0, 2.0)
@@ -0,0 +1,45 @@
+from datetime import date
+from types import SimpleNamespace
+
+from app.schemas.marketing_data import MarketingDataCreate
+from app.services.ingestion_service import compute_content_hash, dedupe_rows
+
+
+def make_row(day: int = 1, channel: str = "TV", spend: float = 100.0, **values) -> MarketingDataCreate:
+    return MarketingDataCreate(date=date(2024, 1, day), channel=channel, spend=spend, **values)
+
+
+def test_content_hash_is_stable_for_equal_rows():
+    assert compute_content_hash(make_row(revenue=250.0)) == compute_content_hash(make_row(revenue=250.0))
+
+
+def test_content_hash_changes_with_key_and_values():
+    base = compute_content_hash(make_row())
+    assert compute_content_hash(make_row(day=2)) != base
+    assert compute_content_hash(make_row(channel="Radio")) != base
+    assert compute_content_hash(make_row(spend=100.0000001)) != base
+    assert compute_content_hash(make_row(clicks=0.0)) != base
+
+
+def test_content_hash_distinguishes_missing_from_zero():
+    assert compute_content_hash(make_row(revenue=None)) != compute_content_hash(make_row(revenue=0.0))
+
+
+def test_content_hash_matches_database_rows():
+    row = make_row(impressions=1000.0, revenue=250.0)
+    db_row = SimpleNamespace(date=row.date, channel=row.channel, spend=100.0, impressions=1000.0,
+                             clicks=None, conversions=None, revenue=250.0)
+    assert compute_content_hash(db_row) == compute_content_hash(row)
+
+
+def test_dedupe_rows_keeps_last_occurrence_per_key():
+    first, other, last = make_row(spend=1.0), make_row(channel="Radio"), make_row(spend=2.0)
+    unique, duplicates = dedupe_rows([first, other, last])
+    assert duplicates == 1
+    assert unique == [last, other]
+
+
+def test_dedupe_rows_without_duplicates():
+    rows = [make_row(day=1), make_row(day=2)]
+    assert dedupe_rows(rows) == (rows, 0)
+    assert dedupe_rows([]) == ([], 0)
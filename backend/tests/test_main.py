@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.quota import InMemoryQuotaBackend, QuotaManager
+from app.main import app
+import app.main as main
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    # One request per tenant, whatever the tier
+    tiers = {tier: {"rate": {"read": [0.001, 1]}} for tier in ("basic", "professional", "enterprise")}
+    manager = QuotaManager(InMemoryQuotaBackend(), tiers=tiers, default_features=[])
+    monkeypatch.setattr(main, "quota_manager", manager)
+    return manager
+
+
+def test_tenant_requests_are_rate_limited(manager):
+    with TestClient(app) as client:
+        assert client.get("/health", headers={"host": "acme.yourapp.com"}).status_code == 200
+        assert client.get("/health", headers={"host": "acme.yourapp.com"}).status_code == 429
+
+
+@pytest.mark.parametrize("host", ["api.yourapp.com", "admin.yourapp.com", "localhost"])
+def test_requests_without_a_tenant_are_not_limited(manager, host):
+    with TestClient(app) as client:
+        for _ in range(3):
+            assert client.get("/health", headers={"host": host}).status_code == 200
+    assert not manager.backend._buckets
+
+
+def test_known_tenant_tiers_are_registered_at_startup(manager):
+    with TestClient(app):
+        pass
+    assert manager.limits_for("acme").name == "professional"
@@ -0,0 +1,69 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.mmm_service import MMMService, _fit_worker, fit_mmm, geometric_adstock
+from app.utils.memory import MB, current_rss_bytes
+
+CHANNELS = ["Facebook", "Google", "TV"]
+
+
+def synthetic_series(n_days: int = 120, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    spend = rng.uniform(50, 500, size=(n_days, len(CHANNELS)))
+    revenue = 1000 + sum(
+        coef * geometric_adstock(spend[:, i], decay)
+        for i, (coef, decay) in enumerate([(2.0, 0.4), (3.5, 0.2), (1.2, 0.6)])
+    )
+    return spend, revenue + rng.normal(0, 20, n_days)
+
+
+def test_fit_mmm_is_unchanged_by_chunking_and_spill(tmp_path):
+    spend, revenue = synthetic_series()
+    default = fit_mmm(CHANNELS, spend, revenue, date(2024, 1, 1))
+    spilled = fit_mmm(CHANNELS, spend, revenue, date(2024, 1, 1), max_block_bytes=16 * 1024,
+                      spill_dir=str(tmp_path))
+
+    assert [a.channel for a in spilled.channel_attribution] == [a.channel for a in default.channel_attribution]
+    for expected, actual in zip(default.channel_attribution, spilled.channel_attribution):
+        assert actual.adstock_decay == expected.adstock_decay
+        assert actual.half_saturation == expected.half_saturation
+        assert actual.contribution == pytest.approx(expected.contribution, rel=1e-9)
+        assert actual.roi == pytest.approx(expected.roi, rel=1e-9)
+    assert spilled.model_accuracy.r_squared == pytest.approx(default.model_accuracy.r_squared, rel=1e-9)
+    assert spilled.model_accuracy.mape == pytest.approx(default.model_accuracy.mape, rel=1e-9)
+
+
+def test_run_job_without_data_fails_with_message(monkeypatch):
+    def no_data(self, tenant_id):
+        raise ValueError(f"No marketing data for tenant {tenant_id}")
+    monkeypatch.setattr(MMMService, "load_tenant_data", no_data)
+
+    job = MMMService(db=None).run_job("empty", analysis_id="mmm_test")
+    assert job.analysis_id == "mmm_test"
+    assert job.status == "failed"
+    assert job.message == "No marketing data for tenant empty"
+
+
+def test_fit_worker_reports_increase_over_its_own_baseline():
+    spend, revenue = synthetic_series()
+    _, increase = _fit_worker(CHANNELS, spend, revenue, date(2024, 1, 1), None, 256 * MB, None)
+    # The test process itself holds far more than one small fit needs
+    assert increase is not None and increase < current_rss_bytes()
+
+
+def test_isolated_job_budget_reserves_worker_baseline(monkeypatch):
+    spend, revenue = synthetic_series()
+    monkeypatch.setattr(MMMService, "load_tenant_data",
+                        lambda self, tenant_id: (CHANNELS, date(2024, 1, 1), spend, revenue))
+    monkeypatch.setattr(settings, "ANALYSIS_MEMORY_LIMIT_MB", 100)
+    monkeypatch.setattr(settings, "ANALYSIS_WORKER_BASELINE_MB", 100)
+
+    job = MMMService(db=None).run_job("acme", isolate=True)
+    assert job.status == "failed"
+    assert "0 MB available" in job.message
+
+    # Inline jobs have no worker to reserve for
+    assert MMMService(db=None).run_job("acme", isolate=False).status == "completed"
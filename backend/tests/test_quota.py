@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.core.quota import (
+    ROUTE_CLASS_ANALYSIS,
+    ROUTE_CLASS_INGESTION,
+    ROUTE_CLASS_READ,
+    InMemoryQuotaBackend,
+    QuotaExceeded,
+    QuotaManager,
+    TokenBucket,
+)
+
+TIERS = {
+    "basic": {"rate": {"read": [1.0, 2]}, "concurrency": {"analysis": 1}},
+    "professional": {"rate": {"read": [10.0, 20]}, "concurrency": {"analysis": 2}},
+    "enterprise": {"rate": {}, "concurrency": {}},
+}
+
+
+def test_bucket_allows_burst_then_reports_wait():
+    bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+    assert [bucket.consume(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.consume(0.0) == pytest.approx(0.5)
+
+
+def test_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+    for _ in range(3):
+        bucket.consume(0.0)
+    assert bucket.consume(0.25) == pytest.approx(0.25)  # half a token refilled
+    assert bucket.consume(0.5) == 0.0
+
+
+def test_bucket_refill_is_capped_at_burst():
+    bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+    bucket.consume(0.0)
+    assert [bucket.consume(100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.consume(100.0) > 0.0
+
+
+def make_manager(**backend_kwargs) -> QuotaManager:
+    manager = QuotaManager(InMemoryQuotaBackend(**backend_kwargs), tiers=TIERS, default_features=[])
+    manager.set_tenant_features("acme", ["advanced_analysis"])
+    return manager
+
+
+def test_acquire_slot_up_to_tier_limit_then_release():
+    manager = make_manager()
+
+    async def scenario():
+        assert await manager.acquire_slot("acme", ROUTE_CLASS_ANALYSIS)
+        assert await manager.acquire_slot("acme", ROUTE_CLASS_ANALYSIS)
+        with pytest.raises(QuotaExceeded):
+            await manager.acquire_slot("acme", ROUTE_CLASS_ANALYSIS)
+        # Other tenants have their own slots, at the default tier
+        assert await manager.acquire_slot("globex", ROUTE_CLASS_ANALYSIS)
+        with pytest.raises(QuotaExceeded):
+            await manager.acquire_slot("globex", ROUTE_CLASS_ANALYSIS)
+
+        await manager.release_slot("acme", ROUTE_CLASS_ANALYSIS)
+        assert await manager.acquire_slot("acme", ROUTE_CLASS_ANALYSIS)
+
+    asyncio.run(scenario())
+
+
+def test_unlimited_route_class_holds_no_slot():
+    manager = make_manager()
+    assert asyncio.run(manager.acquire_slot("acme", ROUTE_CLASS_INGESTION)) is False
+
+
+def test_released_slots_leave_no_state():
+    manager = make_manager()
+
+    async def scenario():
+        await manager.acquire_slot("acme", ROUTE_CLASS_ANALYSIS)
+        await manager.release_slot("acme", ROUTE_CLASS_ANALYSIS)
+        await manager.release_slot("acme", ROUTE_CLASS_ANALYSIS)  # extra release is ignored
+
+    asyncio.run(scenario())
+    assert manager.backend._inflight == {}
+
+
+def test_check_rate_raises_with_retry_after():
+    manager = make_manager()
+
+    async def scenario():
+        await manager.check_rate("globex", ROUTE_CLASS_READ)
+        await manager.check_rate("globex", ROUTE_CLASS_READ)
+        with pytest.raises(QuotaExceeded) as exc_info:
+            await manager.check_rate("globex", ROUTE_CLASS_READ)
+        assert exc_info.value.retry_after_header == "1"
+
+    asyncio.run(scenario())
+
+
+def test_backend_tracks_a_bounded_number_of_tenants():
+    manager = make_manager(max_tenants=2)
+
+    async def scenario():
+        for tenant_id in ("a", "b", "a", "c"):
+            await manager.check_rate(tenant_id, ROUTE_CLASS_READ)
+
+    asyncio.run(scenario())
+    # "b" was the least recently seen when "c" arrived
+    assert list(manager.backend._buckets) == ["a", "c"]
@@ -0,0 +1,47 @@
+import json
+from datetime import date, datetime, timezone
+
+from app.models.marketing_data import MarketingData
+from app.models.tenant import Tenant
+from app.routers.admin import MOCK_TENANTS
+from app.schemas.marketing_data import MarketingDataInDBListAdapter
+from app.schemas.tenant import TenantSummary, TenantSummaryListAdapter
+from app.utils.serialization import typed_json_response
+
+
+def test_tenant_summary_serializes_with_camel_case_aliases():
+    summary = TenantSummary.model_validate(MOCK_TENANTS[0])
+    dumped = summary.model_dump(by_alias=True)
+    assert dumped["primaryColor"] == "#3B82F6"
+    assert dumped["secondaryColor"] == "#1E40AF"
+    assert "primary_color" not in dumped
+
+
+def test_tenant_summary_reads_orm_rows_by_field_name():
+    tenant = Tenant(id="acme", name="Acme", subdomain="acme", industry=None, features=["dashboard"],
+                    primary_color="#000000", secondary_color="#FFFFFF", is_active=True)
+    summary = TenantSummary.model_validate(tenant)
+    assert (summary.primary_color, summary.secondary_color) == ("#000000", "#FFFFFF")
+
+
+def test_typed_json_response_writes_aliases():
+    tenants = TenantSummaryListAdapter.validate_python(MOCK_TENANTS)
+    body = json.loads(typed_json_response(TenantSummaryListAdapter, tenants).body)
+    assert [t["primaryColor"] for t in body] == [t["primaryColor"] for t in MOCK_TENANTS]
+
+
+def test_marketing_data_adapter_round_trips_orm_rows():
+    created = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    rows = [
+        MarketingData(id="row-1", tenant_id="acme", date=date(2024, 1, 1), channel="TV", spend=100.0,
+                      impressions=1000.0, clicks=None, conversions=5.0, revenue=250.0, created_at=created),
+        MarketingData(id="row-2", tenant_id="acme", date=date(2024, 1, 1), channel="Radio", spend=50.0,
+                      created_at=created, updated_at=created),
+    ]
+    data = MarketingDataInDBListAdapter.validate_python(rows, from_attributes=True)
+
+    assert [(item.id, item.channel, item.spend, item.clicks) for item in data] == [
+        ("row-1", "TV", 100.0, None), ("row-2", "Radio", 50.0, None)
+    ]
+    assert data[0].created_at == created and data[1].updated_at == created
+    assert MarketingDataInDBListAdapter.validate_json(MarketingDataInDBListAdapter.dump_json(data)) == data
@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.quota import ROUTE_CLASS_ANALYSIS, InMemoryQuotaBackend, QuotaManager
+from app.routers import tenant
+from app.schemas.marketing_data import AnalysisResult
+from app.services.mmm_service import MMMService
+from app.utils.db import get_db
+
+
+def bind_database(app: FastAPI, session_factory, monkeypatch) -> None:
+    """Point the routes and background jobs at the test database"""
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(tenant, "SessionLocal", session_factory)
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    app = FastAPI()
+    app.include_router(tenant.router, prefix="/tenant")
+    bind_database(app, session_factory, monkeypatch)
+    return TestClient(app)
+
+
+def test_run_stores_job_result(client, monkeypatch):
+    def run_job(self, tenant_id, analysis_id=None, **kwargs):
+        return AnalysisResult(analysis_id=analysis_id, status="completed",
+                              created_at=datetime.now(timezone.utc), message=tenant_id)
+    monkeypatch.setattr(MMMService, "run_job", run_job)
+
+    started = client.post("/tenant/analysis/run?tenant_id=acme", json={})
+    assert started.status_code == 202
+    assert started.json()["status"] == "processing"
+
+    # TestClient runs background tasks before returning the response
+    analysis_id = started.json()["analysis_id"]
+    job = client.get(f"/tenant/analysis/{analysis_id}?tenant_id=acme").json()
+    assert job["status"] == "completed"
+    assert job["message"] == "acme"
+    assert client.get(f"/tenant/analysis/{analysis_id}?tenant_id=globex").status_code == 404
+
+
+def test_unexpected_job_error_is_stored_as_failed(client, monkeypatch):
+    def run_job(self, tenant_id, analysis_id=None, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(MMMService, "run_job", run_job)
+
+    analysis_id = client.post("/tenant/analysis/run?tenant_id=acme").json()["analysis_id"]
+    job = client.get(f"/tenant/analysis/{analysis_id}?tenant_id=acme").json()
+    assert job["status"] == "failed"
+
+
+def test_unknown_analysis_is_not_found(client):
+    assert client.get("/tenant/analysis/mmm_missing?tenant_id=acme").status_code == 404
+
+
+def test_jobs_are_visible_to_other_sessions(client, session_factory, monkeypatch):
+    monkeypatch.setattr(MMMService, "run_job", lambda self, tenant_id, analysis_id=None, **kwargs: AnalysisResult(
+        analysis_id=analysis_id, status="completed", created_at=datetime.now(timezone.utc)))
+    analysis_id = client.post("/tenant/analysis/run?tenant_id=acme").json()["analysis_id"]
+
+    # As another API worker would see it
+    with session_factory() as db:
+        assert MMMService(db).get_job("acme", analysis_id).status == "completed"
+        assert MMMService(db).get_job("globex", analysis_id) is None
+
+
+@pytest.fixture
+def main_client(session_factory, monkeypatch):
+    """Client for app.main with the tenant router mounted and a fresh quota manager"""
+    import app.main as main
+
+    manager = QuotaManager(InMemoryQuotaBackend(), tiers={tier: {"concurrency": {"analysis": 1}}
+                                                        for tier in ("basic", "professional", "enterprise")},
+                           default_features=[])
+    monkeypatch.setattr(main, "quota_manager", manager)
+    monkeypatch.setattr(tenant, "quota_manager", manager)
+    bind_database(main.app, session_factory, monkeypatch)
+    routes = list(main.app.router.routes)
+    main.app.include_router(tenant.router, prefix="/tenant")
+    try:
+        yield TestClient(main.app), manager
+    finally:
+        main.app.router.routes[:] = routes
+
+
+def test_analysis_slot_belongs_to_the_subdomain_tenant(main_client, monkeypatch):
+    client, manager = main_client
+    held = []
+
+    def run_job(self, tenant_id, analysis_id=None, **kwargs):
+        held.append({t: dict(c) for t, c in manager.backend._inflight.items()})
+        return AnalysisResult(analysis_id=analysis_id, status="completed", created_at=datetime.now(timezone.utc))
+    monkeypatch.setattr(MMMService, "run_job", run_job)
+
+    # No tenant_id query parameter: the route's data tenant defaults to acme
+    response = client.post("/tenant/analysis/run", headers={"host": "globex.yourapp.com"})
+    assert response.status_code == 202
+    assert held == [{"globex": {ROUTE_CLASS_ANALYSIS: 1}}]
+    # Released once the job finished
+    assert manager.backend._inflight == {}
+
+
+def test_run_is_rejected_while_subdomain_tenant_has_a_job_running(main_client):
+    client, manager = main_client
+    asyncio.run(manager.acquire_slot("globex", ROUTE_CLASS_ANALYSIS))
+
+    # Naming another tenant in the query string does not bypass the cap
+    response = client.post("/tenant/analysis/run?tenant_id=acme", headers={"host": "globex.yourapp.com"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert client.post("/tenant/analysis/run", headers={"host": "acme.yourapp.com"}).status_code == 202
+
+
+def test_requests_without_a_tenant_take_no_slot(main_client, monkeypatch):
+    client, manager = main_client
+    monkeypatch.setattr(MMMService, "run_job", lambda self, tenant_id, analysis_id=None, **kwargs: AnalysisResult(
+        analysis_id=analysis_id, status="completed", created_at=datetime.now(timezone.utc)))
+    assert client.post("/tenant/analysis/run", headers={"host": "api.yourapp.com"}).status_code == 202
+    assert manager.backend._inflight == {}
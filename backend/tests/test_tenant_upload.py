@@ -0,0 +1,62 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.routers import tenant
+from app.services.ingestion_service import IngestionService
+from app.utils.db import get_db
+
+CSV = b"date,channel,spend,revenue\n2024-01-01,TV,100,250\n"
+
+
+class FakeSession:
+    def rollback(self):
+        pass
+
+
+class PgError(Exception):
+    def __init__(self, pgcode: str):
+        self.pgcode = pgcode
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(tenant.router, prefix="/tenant")
+    app.dependency_overrides[get_db] = FakeSession
+    return TestClient(app)
+
+
+def fail_ingest(monkeypatch, pgcode: str):
+    def ingest(self, tenant_id, rows, mode):
+        raise IntegrityError("INSERT", {}, PgError(pgcode))
+    monkeypatch.setattr(IngestionService, "ingest", ingest)
+
+
+def upload(client, content: bytes, mode: str = "upsert"):
+    return client.post(f"/tenant/data/upload?mode={mode}", files={"file": ("data.csv", content, "text/csv")})
+
+
+def test_non_utf8_upload_is_rejected(client):
+    response = upload(client, "date,channel,spend\n2024-01-01,Télé,1\n".encode("latin-1"))
+    assert response.status_code == 422
+
+
+def test_unique_violation_in_append_mode_is_conflict(client, monkeypatch):
+    fail_ingest(monkeypatch, tenant.UNIQUE_VIOLATION)
+    assert upload(client, CSV, mode="append").status_code == 409
+
+
+def test_unknown_tenant_is_not_found_in_any_mode(client, monkeypatch):
+    fail_ingest(monkeypatch, tenant.FOREIGN_KEY_VIOLATION)
+    for mode in ("append", "upsert"):
+        response = upload(client, CSV, mode=mode)
+        assert response.status_code == 404
+        assert "upsert mode" not in response.json()["detail"]
+
+
+def test_unique_violation_in_upsert_mode_is_not_reported_as_conflict(client, monkeypatch):
+    fail_ingest(monkeypatch, tenant.UNIQUE_VIOLATION)
+    with pytest.raises(IntegrityError):
+        upload(client, CSV, mode="upsert")